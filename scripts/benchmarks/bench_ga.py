@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ees.optimization_ga import GAOptimizationStudy
+from headless_model import inputs, outputs, decision_variables, headless_backend, model_file
+
+
+def config():
+    low = tuple([v[0] for _, v in decision_variables.items()])
+    up = tuple([v[1] for _, v in decision_variables.items()])
+    return {
+        'seed': 5,
+        'population': 50,
+        'crossover': {'rate': 0.5, 'method': 'cxTwoPoint', 'params': {}},
+        'mutation': {'rate': 0.2, 'method': 'mutPolynomialBounded', 'params': {'indpb': 0.15, 'low': low, 'up': up, 'eta': 3}},
+        'selection': {'method': 'selTournament', 'params': {'tournsize': 5}},
+        'max_generation': 10,
+        'cvrg_tolerance': 1e-8,
+        'verbose': False
+    }
+
+
+def main():
+    EES_model = model_file(os.path.join(tempfile.gettempdir(), 'ees-bench'))
+    backend = headless_backend(solve_latency=0.01)
+    target_variable = {"target_variable": "EUF_sys", "target_variable_display": r"$ EUF $", "problem": "max"}
+
+    timings = {}
+    for evaluation, sessions in [("dde", 1), ("dde", 4), ("batch", 1), ("batch", 4)]:
+        eesopt = GAOptimizationStudy(None, EES_model, inputs, outputs, runID=f'bench_{evaluation}_{sessions}',
+                                     backend=backend, sessions=sessions, evaluation=evaluation)
+        eesopt.set_decision_variables(decision_variables)
+        eesopt.set_target_variable(**target_variable)
+        start = time.time()
+        result = eesopt.execute(config())
+        timings[(evaluation, sessions)] = (time.time() - start, result["best_target"])
+
+    for (evaluation, sessions), (delta_t, best_target) in timings.items():
+        print(f"GA ({evaluation}, {sessions} sessões): {delta_t:.2f} s | {best_target}")
+
+
+if __name__ == "__main__":
+    main()
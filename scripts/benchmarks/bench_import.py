@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+
+
+MODULES = ['ees.macros', 'ees.backends', 'ees.workers', 'ees.store', 'ees.cache', 'ees.catalog', 'ees.solvemodel',
+           'ees.parametric', 'ees.factorial', 'ees.doe', 'ees.optimization', 'ees.optimization_ga',
+           'ees.optimization_param_analysis', 'ees.modelsankey']
+HEAVY = ['pandas', 'rich', 'icecream', 'deap', 'matplotlib', 'plotly', 'scipy', 'win32ui', 'dde', 'pyperclip']
+
+# Runs in a new interpreter for each module, so nothing is imported yet.
+MEASURE = """
+import sys, time, json
+sys.path.append({src!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=3):
+    src = os.path.join(os.getcwd(), 'src')
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-c', MEASURE.format(src=src, module=module, heavy=HEAVY)],
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            return None, completed.stderr.strip().splitlines()[-1]
+        runs.append(json.loads(completed.stdout))
+    return min(run['elapsed'] for run in runs), runs[0]['heavy']
+
+
+def main():
+    for module in MODULES:
+        elapsed, heavy = measure(module)
+        if elapsed is None:
+            print(f"{module}: erro ({heavy})")
+            continue
+        print(f"{module}: {elapsed * 1000:.1f} ms" + (f" (carrega {', '.join(heavy)})" if heavy else ""))
+
+
+if __name__ == "__main__":
+    main()
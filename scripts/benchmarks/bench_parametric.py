@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+from ees.parametric import ParametricStudies
+from headless_model import inputs, outputs, headless_backend, model_file
+
+
+def main():
+    EES_model = model_file(os.path.join(tempfile.gettempdir(), 'ees-bench'))
+    backend = headless_backend(solve_latency=0.02)
+
+    parametric_inputs = {
+        'T[19]': np.linspace(35, 48, 20),
+        'T[22]': np.linspace(1, 6, 20),
+        'T[10]': np.linspace(35, 44, 20),
+        'MR': np.linspace(0.5, 4.5, 20),
+    }
+
+    for workers in [1, 2, 4, 8]:
+        start = time.time()
+        eesmodel = ParametricStudies(None, EES_model, inputs, parametric_inputs, outputs,
+                                     run_id=f'bench_workers_{workers}', backend=backend, workers=workers)
+        eesmodel.execute()
+        print(f"ParametricStudies ({workers} workers): {time.time() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ees.solvemodel import SolveModel
+from headless_model import inputs, outputs, headless_backend, model_file
+
+
+def main():
+    EES_model = model_file(os.path.join(tempfile.gettempdir(), 'ees-bench'))
+    backend = headless_backend(solve_latency=0.05)
+
+    start = time.time()
+    n_runs = 20
+    for i in range(n_runs):
+        model = SolveModel(None, EES_model, inputs, outputs, runID=f'bench_{i}', backend=backend)
+        model.execute()
+    delta_t = time.time() - start
+    print(f"SolveModel: {n_runs} execuções em {delta_t:.2f} s ({delta_t / n_runs * 1000:.1f} ms/execução)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ees.optimization_ga import GAOptimizationStudy
+from headless_model import inputs, outputs, decision_variables, headless_backend, model_file
+from bench_ga import config
+
+
+def main():
+    EES_model = model_file(os.path.join(tempfile.gettempdir(), 'ees-bench'))
+    backend = headless_backend(solve_latency=0.01)
+    target_variable = {"target_variable": "EUF_sys", "target_variable_display": r"$ EUF $", "problem": "max"}
+
+    timings = {}
+    for surrogate in [None, {"fraction": 0.25, "error_threshold": 0.1}]:
+        ga_config = config()
+        ga_config["max_generation"] = 30
+        ga_config["surrogate"] = surrogate
+        eesopt = GAOptimizationStudy(None, EES_model, inputs, outputs, runID=f'bench_surrogate_{bool(surrogate)}',
+                                     backend=backend)
+        eesopt.set_decision_variables(decision_variables)
+        eesopt.set_target_variable(**target_variable)
+        start = time.time()
+        result = eesopt.execute(ga_config)
+        timings[bool(surrogate)] = (time.time() - start, result["evaluations"], result["best_target"])
+
+    for surrogate, (delta_t, evaluations, best_target) in timings.items():
+        print(f"GA (surrogate={surrogate}): {delta_t:.2f} s | {evaluations} avaliações no EES | {best_target}")
+
+
+if __name__ == "__main__":
+    main()
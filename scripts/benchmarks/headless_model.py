@@ -0,0 +1,64 @@
+import os
+import sys
+import math
+sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.backends import HeadlessBackend
+
+
+inputs = {
+    'T[10]': 35,
+    'T[13]': 85,
+    'T[19]': 40,
+    'T[22]': 5,
+    'MR': 2.5,
+    'T[34]': 80,
+    'T_0': 25,
+}
+outputs = ['W_net', 'Q_gerador', 'COP_1', 'GOR', 'm_dot[38]', 'EUF_sys', 'psi_sys_1', 'Exd_sys']
+decision_variables = {
+    'T[10]': (35, 44),
+    'T[19]': (35, 48),
+    'T[13]': (75, 90),
+    'T[22]': (1, 6),
+    'MR': (0.5, 4.5),
+    'T[34]': (68, 100)
+}
+
+
+def trigeneration_model(v: dict) -> dict:
+    """Smooth analytical stand-in for the trigeneration EES model (values are not physical)."""
+    if v['T[13]'] - v['T[10]'] < 30:
+        raise ValueError("Não convergiu.")
+
+    cop = 0.7 + 0.004 * (v['T[13]'] - 85) - 0.01 * (v['T[10]'] - 35) + 0.005 * v['T[22]']
+    q_gerador = 12 / cop
+    gor = 3.5 - 0.4 * (v['MR'] - 2.5) ** 2 + 0.02 * (v['T[34]'] - 80)
+    m_dot_38 = 0.001 * gor * math.log(1 + v['T[34]'] - v['T[19]'])
+    w_net = 30.0 - 0.05 * (v['T[19]'] - 40)
+    euf = (w_net + 12 + 2400 * m_dot_38) / 95
+    psi = 0.3 + 0.002 * (v['T[34]'] - 80) - 0.003 * (v['T[13]'] - 85) + 0.01 * math.sin(v['MR'])
+    return {
+        'W_net': w_net,
+        'Q_gerador': q_gerador,
+        'COP_1': cop,
+        'GOR': gor,
+        'm_dot[38]': m_dot_38,
+        'EUF_sys': euf,
+        'psi_sys_1': psi,
+        'Exd_sys': 95 * (1 - psi),
+    }
+
+
+def headless_backend(solve_latency: float = 0.05, startup_latency: float = 0.0) -> HeadlessBackend:
+    return HeadlessBackend(trigeneration_model, solve_latency=solve_latency, startup_latency=startup_latency)
+
+
+def model_file(folder: str) -> str:
+    """Creates an empty model file, only its path matters for the headless backend."""
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    EES_model = os.path.join(folder, 'trigeracao_headless.EES')
+    if not os.path.exists(EES_model):
+        with open(EES_model, 'w') as modelfile:
+            modelfile.write('{Headless model}')
+    return EES_model
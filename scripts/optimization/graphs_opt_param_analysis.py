@@ -2,6 +2,7 @@ import os
 import sys
 import math
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 from ees.optimization_param_graphs import OptParamGraphs
 from ees.utilities import d_difference
 import pandas as pd
@@ -70,6 +71,7 @@ class DefaultParamAnalysisGraph(OptParamGraphs):
 
         return [round(tv, case) for tv in target_values]
 
+    @styled
     def generate(self, lang: str = "pt-BR"):
         titles = self.get_titles(lang)
         yticks = []
@@ -144,9 +146,10 @@ class DefaultParamAnalysisGraph(OptParamGraphs):
                 os.makedirs(folder)
 
             filename = os.path.join(folder, f"{param}.pdf")
-            plt.savefig(filename)
+            save_figure(self, fig, filename)
             fig.clf()
 
+    @styled
     def generate_log(self, lang: str = "pt-BR"):
         titles = self.get_titles(lang)
         yticks = []
@@ -225,9 +228,10 @@ class DefaultParamAnalysisGraph(OptParamGraphs):
                 os.makedirs(folder)
 
             filename = os.path.join(folder, f"{param}.pdf")
-            plt.savefig(filename)
+            save_figure(self, fig, filename)
             fig.clf()
 
+    @styled
     def generate_old(self, lang: str = "pt-BR"):
         titles = self.get_titles(lang)
         yticks = []
@@ -309,5 +313,5 @@ class DefaultParamAnalysisGraph(OptParamGraphs):
                                pos.height + 0.07 * 0.45])
 
             filename = os.path.join(self.plots_folder, f"{lang}_analysis-of-{param}.jpg")
-            plt.savefig(filename)
+            save_figure(self, fig, filename)
             fig.clf()
@@ -1,7 +1,9 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 from ees.parametric_graphs import Graphs
+from ees.store import load_parametric_result
 import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
@@ -9,11 +11,12 @@ import matplotlib.font_manager as font_manager
 
 
 class DollarAnalisys():
+    plot_style = "parametric"
+    plot_style_overrides = None
 
     def __init__(self, EES_models):
         self.paths = self.set_paths(EES_models)
         self.dfs = self.get_df()
-        self.set_matplotlib_globalconfig()
 
     def set_paths(self, EES_models):
         paths = {}
@@ -36,47 +39,12 @@ class DollarAnalisys():
     def get_df(self):
         dfs = {}
         for model_name, path in self.paths.items():
-            filepath = path.get("csv")
-            df = pd.read_csv(filepath, sep=";")
+            df = load_parametric_result(os.path.dirname(path.get("csv")))
             if 'tpb2' in df.columns:
                 df = df.rename(columns={'tpb2': 'payback_simples_2'})
             dfs.update({model_name: df})
         return dfs
 
-    def set_matplotlib_globalconfig(self):
-        plt.style.use("ggplot")
-
-        font_dir = [r"C:\Root\Download\computer-modern"]
-        for font in font_manager.findSystemFonts(font_dir):
-            font_manager.fontManager.addfont(font)
-
-        matplotlib.rcParams["mathtext.fontset"] = "cm"
-        matplotlib.rcParams["font.family"] = "CMU Serif"
-
-        axes = {
-            "labelsize": 22,
-            "titlesize": 18,
-            "titleweight": "bold",
-            "labelweight": "bold",
-        }
-        matplotlib.rc("axes", **axes)
-
-        lines = {"linewidth": 2}
-        matplotlib.rc("lines", **lines)
-
-        legends = {"fontsize": 14}
-        matplotlib.rc("legend", **legends)
-
-        savefig = {"dpi": 300}
-        matplotlib.rc("savefig", **savefig)
-
-        matplotlib.rcParams["axes.prop_cycle"] = matplotlib.cycler(
-            color=["004c6d", "7aaac6"],
-            linestyle=["-", "--"]
-        )
-        matplotlib.rcParams["ytick.labelsize"] = 15
-        matplotlib.rcParams["xtick.labelsize"] = 15
-
     def get_titles(self, lang):
         if lang in ["pt-BR", "pt_BR", "ptbr"]:
             titles = {
@@ -105,6 +73,7 @@ class DollarAnalisys():
 
         return titles
 
+    @styled
     def generate(self, lang):
         titles = self.get_titles(lang)
 
@@ -124,11 +93,13 @@ class DollarAnalisys():
         )
         ax1.legend()
         fig1.tight_layout()
-        fig1.savefig(
+        save_figure(
+            self, fig1,
             os.path.join(self.paths['libr'].get("plot"),
                          f"plot_{lang}_dolar_vs_payback.pdf")
         )
 
+    @styled
     def generate_artigo(self, model_name):
         fig1, ax1 = plt.subplots(1, 1, figsize=(8, 7))
         ax1.set_title("Payback time vs Dollar price")
@@ -145,11 +116,13 @@ class DollarAnalisys():
         )
         # ax1.legend()
         fig1.tight_layout()
-        fig1.savefig(
+        save_figure(
+            self, fig1,
             os.path.join(r"C:\Root\Drive\Unicamp\[Unicamp]\[Dissertação]\01 - Algoritmo\Analise\trigeracao_LiBrH2O\paper",
                          "plot_dolar_vs_payback_artigo.pdf")
         )
-        fig1.savefig(
+        save_figure(
+            self, fig1,
             os.path.join(r"C:\Root\Drive\Unicamp\[Unicamp]\[Dissertação]\01 - Algoritmo\Analise\trigeracao_LiBrH2O\paper",
                          "plot_dolar_vs_payback_artigo.jpg")
         )
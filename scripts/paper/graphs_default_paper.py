@@ -1,7 +1,9 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 from ees.parametric_graphs import Graphs
+from ees.store import load_parametric_result
 import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
@@ -10,6 +12,16 @@ from mpl_toolkits.axisartist.parasite_axes import HostAxes, ParasiteAxes
 
 
 class GraphsPaper:
+    plot_style = "optimization"
+    plot_style_overrides = {
+        "axes.labelsize": 18,
+        "axes.titlesize": 16,
+        "legend.fontsize": 13,
+        "xtick.labelsize": 13,
+        "ytick.labelsize": 13,
+        "axes.grid": False,
+        "axes.prop_cycle": matplotlib.style.library["ggplot"]["axes.prop_cycle"],
+    }
 
     def __init__(self, base_path, variable, run_id):
         self.variable = variable
@@ -17,13 +29,10 @@ class GraphsPaper:
         self.base_path = base_path
         self.df = self.get_df()
         self.plots_folder = self.set_plots_folder()
-        self.set_matplotlib_globalconfig()
 
     def get_df(self):
-        filepath = os.path.join(
-            self.base_path, ".ParamAnalysis", self.run_id, ".results", self.variable, "parametric_result.csv"
-        )
-        return pd.read_csv(filepath, sep=";")
+        results_folder = os.path.join(self.base_path, ".ParamAnalysis", self.run_id, ".results", self.variable)
+        return load_parametric_result(results_folder)
 
     def set_plots_folder(self):
         plots_folder = os.path.join(self.base_path, ".ParamAnalysis", self.run_id, ".plots", "paper")
@@ -33,41 +42,7 @@ class GraphsPaper:
 
         return plots_folder
 
-    def set_matplotlib_globalconfig(self):
-        plt.style.use("ggplot")
-
-        font_dir = [r"C:\Root\Download\computer-modern"]
-        for font in font_manager.findSystemFonts(font_dir):
-            font_manager.fontManager.addfont(font)
-
-        matplotlib.rcParams["mathtext.fontset"] = "cm"
-        matplotlib.rcParams["font.family"] = "CMU Serif"
-
-        axes = {
-            "labelsize": 18,
-            "titlesize": 16,
-            "titleweight": "bold",
-            "labelweight": "bold",
-        }
-        matplotlib.rc("axes", **axes)
-
-        lines = {"linewidth": 2}
-        matplotlib.rc("lines", **lines)
-
-        legends = {"fontsize": 13}
-        matplotlib.rc("legend", **legends)
-
-        savefig = {"dpi": 300}
-        matplotlib.rc("savefig", **savefig)
-
-        # matplotlib.rcParams["axes.prop_cycle"] = matplotlib.cycler(
-        #     color=["r", "b", "g", "m", "k"]
-        # )
-        matplotlib.rcParams["ytick.labelsize"] = 13
-        matplotlib.rcParams["xtick.labelsize"] = 13
-        matplotlib.rcParams["axes.grid"] = False
-        # matplotlib.rcParams["axes.edgecolor"] = "grey"
-
+    @styled
     def base_plot(self, var_display_str):
         fig, ax = plt.subplots(figsize=(13, 7))
         fig.subplots_adjust(right=0.75, left=0.25)
@@ -141,8 +116,8 @@ class GraphsPaper:
 
         ax.grid()
 
-        plt.savefig(os.path.join(self.plots_folder, f"plot_paper_{self.variable}.pdf"))
-        plt.savefig(os.path.join(self.plots_folder, f"plot_paper_{self.variable}.jpg"))
+        save_figure(self, fig, os.path.join(self.plots_folder, f"plot_paper_{self.variable}.pdf"))
+        save_figure(self, fig, os.path.join(self.plots_folder, f"plot_paper_{self.variable}.jpg"))
         del fig
 
 
@@ -1,6 +1,7 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 from ees.parametric_graphs import Graphs
 import pandas as pd
 import matplotlib
@@ -49,6 +50,7 @@ class GraphsDefault(Graphs):
 
         return titles
 
+    @styled
     def generate(self, var_display_str, lang="pt-BR"):
 
         titles = self.get_titles(lang)
@@ -85,7 +87,8 @@ class GraphsDefault(Graphs):
         ax2.legend()
 
         fig1.tight_layout()
-        fig1.savefig(
+        save_figure(
+            self, fig1,
             os.path.join(self.plots_folder,
                          f"plot_{lang}_GOR_m_dot[38]_vs_{self.variable}.pdf")
         )
@@ -128,7 +131,8 @@ class GraphsDefault(Graphs):
         ax4.legend()
 
         fig3.tight_layout()
-        fig3.savefig(
+        save_figure(
+            self, fig3,
             os.path.join(
                 self.plots_folder,
                 f"plot_{lang}_eta_brayton_W_net_vs_{self.variable}.pdf",
@@ -170,7 +174,8 @@ class GraphsDefault(Graphs):
         ax6.legend()
 
         fig5.tight_layout()
-        fig5.savefig(
+        save_figure(
+            self, fig5,
             os.path.join(
                 self.plots_folder, f"plot_{lang}_exergy_vs_{self.variable}.pdf"
             ),
@@ -190,7 +195,8 @@ class GraphsDefault(Graphs):
             1.05 * max([df["EUF_sys"].max() for _, df in self.dfs.items()]),
         )
         fig7.tight_layout()
-        fig7.savefig(
+        save_figure(
+            self, fig7,
             os.path.join(self.plots_folder,
                          f"plot_{lang}_EUF_vs_{self.variable}.pdf"),
         )
@@ -210,7 +216,8 @@ class GraphsDefault(Graphs):
         )
         plt.legend()
         fig8.tight_layout()
-        fig8.savefig(
+        save_figure(
+            self, fig8,
             os.path.join(self.plots_folder,
                          f"plot_{lang}_COP_vs_{self.variable}.pdf"),
         )
@@ -1,20 +1,26 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as font_manager
+from ees.store import load_parametric_result
 
 
 class GraphsEffectivenessHDH:
+    plot_style = "parametric"
+    plot_style_overrides = {
+        "legend.fontsize": 12,
+        "axes.prop_cycle": matplotlib.cycler(color=["004c6d", "005b82", "006a98", "007aaf", "008ac6"]),
+    }
 
     def __init__(self, base_paths, lang="pt-BR"):
         self.base_paths = base_paths
         self.lang = lang
         self.dfs = self.get_df()
         self.plots_folder = self.set_plots_folder()
-        self.set_matplotlib_globalconfig()
 
     def get_df(self):
         dfs = {}
@@ -23,12 +29,11 @@ class GraphsEffectivenessHDH:
             results = {}
             for dirname in os.listdir(results_path):
                 if os.path.isdir(os.path.join(results_path, dirname)):
-                    filepath = os.path.join(results_path, dirname, "parametric_result.csv")
                     epsilon_u = dirname.split(" ")[-1]
                     if self.lang in ["pt-BR", "pt_BR", "ptbr"]:
                         epsilon_u = epsilon_u.replace(".", ",")
                     df = (
-                        pd.read_csv(filepath, sep=";")
+                        load_parametric_result(os.path.join(results_path, dirname))
                         .drop(index=2)
                         .drop(index=25)
                         .drop(index=26)
@@ -50,39 +55,6 @@ class GraphsEffectivenessHDH:
 
         return plots_folder
 
-    def set_matplotlib_globalconfig(self):
-        plt.style.use("ggplot")
-
-        font_dir = [r"C:\Root\Download\computer-modern"]
-        for font in font_manager.findSystemFonts(font_dir):
-            font_manager.fontManager.addfont(font)
-
-        matplotlib.rcParams["mathtext.fontset"] = "cm"
-        matplotlib.rcParams["font.family"] = "CMU Serif"
-
-        axes = {
-            "labelsize": 22,
-            "titlesize": 18,
-            "titleweight": "bold",
-            "labelweight": "bold",
-        }
-        matplotlib.rc("axes", **axes)
-
-        lines = {"linewidth": 2}
-        matplotlib.rc("lines", **lines)
-
-        legends = {"fontsize": 12}
-        matplotlib.rc("legend", **legends)
-
-        savefig = {"dpi": 300}
-        matplotlib.rc("savefig", **savefig)
-
-        matplotlib.rcParams["axes.prop_cycle"] = matplotlib.cycler(
-            color=["004c6d", "005b82", "006a98", "007aaf", "008ac6"]
-        )
-        matplotlib.rcParams["ytick.labelsize"] = 15
-        matplotlib.rcParams["xtick.labelsize"] = 15
-
     def get_titles(self):
         if self.lang in ["pt-BR", "pt_BR", "ptbr"]:
             titles = {
@@ -121,6 +93,7 @@ class GraphsEffectivenessHDH:
 
         return titles
 
+    @styled
     def generate(self):
         titles = self.get_titles()
         var_display_str = r"$ \varepsilon_{d} $"
@@ -152,7 +125,8 @@ class GraphsEffectivenessHDH:
         ax1.legend()
         ax2.legend()
         fig1.tight_layout()
-        fig1.savefig(
+        save_figure(
+            self, fig1,
             os.path.join(self.plots_folder, f"plot_{self.lang}_GOR_m_dot[38]_vs_epsilon_d.pdf"),
         )
 
@@ -182,7 +156,8 @@ class GraphsEffectivenessHDH:
         ax3.legend()
         ax4.legend()
         fig3.tight_layout()
-        fig3.savefig(
+        save_figure(
+            self, fig3,
             os.path.join(self.plots_folder, f"plot_{self.lang}_eta_brayton_W_net_vs_epsilon_d.pdf"),
         )
 
@@ -211,7 +186,8 @@ class GraphsEffectivenessHDH:
         ax5.legend()
         ax6.legend()
         fig5.tight_layout()
-        fig5.savefig(
+        save_figure(
+            self, fig5,
             os.path.join(self.plots_folder, f"plot_{self.lang}_exergy_vs_epsilon_d.pdf"),
         )
 
@@ -229,7 +205,8 @@ class GraphsEffectivenessHDH:
 
         ax7.legend()
         fig7.tight_layout()
-        fig7.savefig(
+        save_figure(
+            self, fig7,
             os.path.join(self.plots_folder, f"plot_{self.lang}_EUF_vs_epsilon_d.pdf"),
         )
 
@@ -247,7 +224,8 @@ class GraphsEffectivenessHDH:
 
         ax8.legend()
         fig8.tight_layout()
-        fig8.savefig(
+        save_figure(
+            self, fig8,
             os.path.join(self.plots_folder, f"plot_{self.lang}_COP_vs_epsilon_d.pdf"),
         )
 
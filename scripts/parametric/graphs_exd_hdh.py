@@ -1,6 +1,7 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
@@ -45,6 +46,7 @@ class GraphsHDHExd(Graphs):
 
         return titles
 
+    @styled
     def generate(self, var_display_str, lang="pt-BR"):
         titles = self.get_titles(lang)
 
@@ -101,7 +103,8 @@ class GraphsHDHExd(Graphs):
             ax.legend()
 
         fig.tight_layout()
-        fig.savefig(
+        save_figure(
+            self, fig,
             os.path.join(self.plots_folder, f"plot_{lang}_EXD-HDH_{self.variable}.pdf"),
         )
         fig.clf()
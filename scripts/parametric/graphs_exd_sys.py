@@ -1,6 +1,7 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 import pandas as pd
 from itertools import cycle
 import matplotlib
@@ -72,6 +73,7 @@ class GraphsSysExd(Graphs):
 
         return titles
 
+    @styled
     def generate(self, var_display_str, lang="pt-BR"):
         titles = self.get_titles(lang)
 
@@ -211,7 +213,8 @@ class GraphsSysExd(Graphs):
             ax.legend()
 
         fig.tight_layout()
-        fig.savefig(
+        save_figure(
+            self, fig,
             os.path.join(
                 self.plots_folder, f"plot_{lang}_Decomp-EXD-sys_{self.variable}.pdf"
             )
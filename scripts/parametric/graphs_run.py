@@ -3,6 +3,12 @@ from graphs_sys_eff_decomp import GraphsSysEffDecomp
 from graphs_exd_hdh import GraphsHDHExd
 from graphs_exd_sys import GraphsSysExd
 from graphs_effectiveness_hdh import GraphsEffectivenessHDH
+from ees.rendering import FigureJob, render, print_timings
+
+
+def drop_outlier(graph):
+    for _, df in graph.dfs.items():
+        df.drop(index=6, inplace=True)
 
 
 def main():
@@ -10,88 +16,33 @@ def main():
         r"C:\Root\Drive\Unicamp\[Unicamp]\[Dissertação]\01 - Algoritmo\Analise\.old-important\trigeracao_LiBrH2O",
         r"C:\Root\Drive\Unicamp\[Unicamp]\[Dissertação]\01 - Algoritmo\Analise\.old-important\trigeracao_NH3H2O"
     ]
-
-    graph = GraphsDefault(base_paths, 'T[22]')
-    # graph.generate(r'$ T_{22} $ ($^{\circ}$C)', lang='en-US')
-    graph.generate(r'$ T_{22} $ ($^{\circ}$C)', lang='pt-BR')
-    del graph
-
-    graph = GraphsDefault(base_paths, "T[19]")
-    # graph.generate(r"$ T_{19} $ ($^{\circ}$C)", lang="en-US")
-    graph.generate(r"$ T_{19} $ ($^{\circ}$C)", lang="pt-BR")
-    del graph
-
-    graph = GraphsDefault(base_paths, 'T[10]')
-    # graph.generate(r'$ T_{10} $ ($^{\circ}$C)', lang='en-US')
-    graph.generate(r'$ T_{10} $ ($^{\circ}$C)', lang='pt-BR')
-    del graph
-
-    graph = GraphsDefault(base_paths, 'T[13]')
-    # graph.generate(r'$ T_{13} $ ($^{\circ}$C)', lang='en-US')
-    graph.generate(r'$ T_{13} $ ($^{\circ}$C)', lang='pt-BR')
-    del graph
-
-    graph = GraphsDefault(base_paths, 'epsilon_hx')
-    # graph.generate(r'$ \varepsilon_{SHX} $', lang='en-US')
-    graph.generate(r'$ \varepsilon_{SHX} $', lang='pt-BR')
-    del graph
-
-    # m_dot[9]
-    graph = GraphsDefault(base_paths, 'm_dot[9]')
-    # graph.generate(r'$ \dot{m}_{9} $ (kg/s)', lang='en-US')
-    graph.generate(r'$ \dot{m}_{9} \: (kg \: s^{-1})$', lang='pt-BR')
-
-    # decompgraph = GraphsSysEffDecomp(base_paths, 'm_dot[9]')
-    # decompgraph.generate(r'$ \dot{m}_{9} $ (kg/s)', lang='en-US')
-    # decompgraph.generate(r'$ \dot{m}_{9} $ (kg/s)', lang='pt-BR')
-    # del graph, decompgraph
-    del graph
-
-    # MR
-    graph = GraphsDefault(base_paths, "MR")
-    # graph.generate("MR", lang="en-US")
-    graph.generate("MR", lang="pt-BR")
-
-    exdgraph = GraphsHDHExd(base_paths, "MR")
-    exdgraph.generate('MR', lang="pt-BR")
-    # exdgraph.generate('MR', lang="en-US")
-    # del graph, exdgraph
-    del graph
-
-    # Salinidade
-    graph = GraphsDefault(base_paths, 'salinity')
-    # graph.generate('Salinity (g/kg)', lang='en-US')
-    graph.generate(r'Salinidade $(g \: kg^{-1}$)', lang='pt-BR')
-    del graph
-
-    # T[34]
-    graph = GraphsDefault(base_paths, 'T[34]')
-    for _, df in graph.dfs.items():
-        df.drop(index=6, inplace=True)
-    # graph.generate(r'$ T_{34} $ ($^{\circ}$C)', lang='en-US')
-    graph.generate(r'$ T_{34} $ ($^{\circ}$C)', lang='pt-BR')
-    del graph
-
-    # X_CH4
-    graph = GraphsDefault(base_paths, 'X_biogas_ch4')
-    # graph.generate(r'$ x_{CH_4} $', lang='en-US')
-    graph.generate(r'$ x_{CH_4} $', lang='pt-BR')
-
-    # exdgraph = GraphsSysExd(base_paths, 'X_biogas_ch4')
-    # exdgraph.generate(r'$ x_{CH_4} $', lang='en-US')
-    # exdgraph.generate(r'$ x_{CH_4} $', lang='pt-BR')
-    # del graph, exdgraph
-    del graph
-
-    # efetividades do HDH
-    # graph = GraphsEffectivenessHDH(base_paths, lang='pt-BR')
-    # graph.generate()
-    # del graph
-    # graph = GraphsEffectivenessHDH(base_paths, lang='en-US')
-    # graph.generate()
-    # graphsexd = GraphsHDHExd(base_paths, 'epsilon_d')
-    # graphsexd.generate(r'$ \varepsilon_{d} $', lang='pt-BR')
-    # graphsexd.generate(r'$ \varepsilon_{d} $', lang='en-US')
+    langs = ["pt-BR"]  # ["pt-BR", "en-US"]
+
+    default_graphs = {
+        'T[22]': r'$ T_{22} $ ($^{\circ}$C)',
+        'T[19]': r"$ T_{19} $ ($^{\circ}$C)",
+        'T[10]': r'$ T_{10} $ ($^{\circ}$C)',
+        'T[13]': r'$ T_{13} $ ($^{\circ}$C)',
+        'epsilon_hx': r'$ \varepsilon_{SHX} $',
+        'm_dot[9]': r'$ \dot{m}_{9} \: (kg \: s^{-1})$',
+        'MR': "MR",
+        'salinity': r'Salinidade $(g \: kg^{-1}$)',
+        'T[34]': r'$ T_{34} $ ($^{\circ}$C)',
+        'X_biogas_ch4': r'$ x_{CH_4} $',
+    }
+
+    jobs = []
+    for lang in langs:
+        for variable, display in default_graphs.items():
+            jobs.append(FigureJob(GraphsDefault, (base_paths, variable), generate_args=(display,), lang=lang,
+                                  setup=drop_outlier if variable == 'T[34]' else None))
+        jobs.append(FigureJob(GraphsHDHExd, (base_paths, "MR"), generate_args=('MR',), lang=lang))
+        # jobs.append(FigureJob(GraphsSysEffDecomp, (base_paths, 'm_dot[9]'), generate_args=(r'$ \dot{m}_{9} $ (kg/s)',), lang=lang))
+        # jobs.append(FigureJob(GraphsSysExd, (base_paths, 'X_biogas_ch4'), generate_args=(r'$ x_{CH_4} $',), lang=lang))
+        # jobs.append(FigureJob(GraphsEffectivenessHDH, (base_paths,), {'lang': lang}))
+        # jobs.append(FigureJob(GraphsHDHExd, (base_paths, 'epsilon_d'), generate_args=(r'$ \varepsilon_{d} $',), lang=lang))
+
+    print_timings(render(jobs))
 
 
 def main2():
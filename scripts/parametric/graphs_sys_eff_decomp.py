@@ -1,6 +1,7 @@
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), 'src'))
+from ees.plotstyle import styled, save_figure
 import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
@@ -59,6 +60,7 @@ class GraphsSysEffDecomp(Graphs):
 
         return titles
 
+    @styled
     def generate(self, var_display_str, lang="pt-BR"):
         titles = self.get_titles(lang)
 
@@ -101,7 +103,8 @@ class GraphsSysEffDecomp(Graphs):
             ax.legend(loc="center right")
 
         fig1.tight_layout()
-        fig1.savefig(
+        save_figure(
+            self, fig1,
             os.path.join(
                 self.plots_folder, f"plot_{lang}_EUF-decomp_{self.variable}.pdf"
             )
@@ -155,7 +158,8 @@ class GraphsSysEffDecomp(Graphs):
             ax.legend(handles=[l1, l2, l3, l4], loc="upper right")
 
         fig2.tight_layout()
-        fig2.savefig(
+        save_figure(
+            self, fig2,
             os.path.join(
                 self.plots_folder, f"plot_{lang}_psi-decomp_vs_{self.variable}.pdf"
             ),
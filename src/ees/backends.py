@@ -0,0 +1,326 @@
+import re
+import time
+import asyncio
+import subprocess
+from .utilities import SolverError
+
+
+class EESBackend:
+    """Runs models on the EES executable (Windows only). Uses subprocess for macros and DDE for sessions."""
+
+    # Every EES process serves the same DDE service/topic ("EES", "DDE"), so a second session would attach to the
+    # process of the first one. DDEML conversations are also bound to the thread that created them.
+    concurrent_sessions = False
+
+    def __init__(self, EES_exe):
+        self.EES_exe = EES_exe
+
+    def run_macro(self, macro_filepath):
+        """Runs the macro file (.emf) on a new EES process and waits for it to finish."""
+
+        subprocess.run([self.EES_exe, macro_filepath, '/hide', '/NOSPLASH'])
+
+    async def run_macro_async(self, macro_filepath):
+        """Same as run_macro on an asyncio subprocess. The EES process is killed if the task is cancelled."""
+
+        process = await asyncio.create_subprocess_exec(self.EES_exe, macro_filepath, '/hide', '/NOSPLASH')
+        try:
+            await process.wait()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+    def open_session(self, server_name="PyhtonDDExyUiosdjU"):
+        """Returns a new (not started) DDE session. Each concurrent session needs its own server name."""
+
+        return EESSession(self.EES_exe, server_name)
+
+
+class EESSession:
+    """DDE conversation with an EES process started (and owned) by this session.
+
+    DDE does not tell which process answers the "EES" service, so the session refuses to start while another EES
+    is already serving it: otherwise it would talk to (and close) a process it does not own.
+    """
+
+    def __init__(self, EES_exe, server_name="PyhtonDDExyUiosdjU"):
+        self.EES_exe = EES_exe
+        self.server_name = server_name
+        self.process = None
+        self.server = None
+
+    def start(self, timeout=60, poll_interval=0.5):
+        """Opens EES and polls the DDE connection until EES answers (or timeout, in seconds)."""
+        import win32ui
+        import dde
+
+        self.server = dde.CreateServer()
+        self.server.Create(self.server_name)
+        self.connector = dde.CreateConversation(self.server)
+        try:
+            self.connector.ConnectTo("EES", "DDE")
+        except dde.error:
+            pass
+        else:
+            self.shutdown_server()
+            raise SolverError("Outro EES já está aberto e respondendo via DDE. Feche-o antes de iniciar a sessão.")
+
+        self.process = subprocess.Popen([self.EES_exe, '/hide'], close_fds=True)
+
+        deadline = time.time() + timeout
+        while True:
+            try:
+                self.connector.ConnectTo("EES", "DDE")
+                return
+            except dde.error as e:
+                if self.process.poll() is not None:
+                    self.kill()
+                    raise SolverError("O EES foi fechado durante a inicialização.") from e
+                if time.time() > deadline:
+                    self.kill()
+                    raise SolverError(f"O EES não respondeu via DDE em {timeout} s.") from e
+                time.sleep(poll_interval)
+
+    def exec(self, command):
+        """Executes a DDE command (e.g. '[SOLVE]') on EES."""
+        import dde
+
+        try:
+            self.connector.Exec(command)
+        except dde.error as e:
+            raise SolverError(str(e)) from e
+
+    def copy(self, text):
+        import pyperclip
+        pyperclip.copy(text)
+
+    def paste(self):
+        import pyperclip
+        return pyperclip.paste()
+
+    def close(self, timeout=30):
+        """Asks EES to quit and waits for its process to exit. Kills it if it does not (or DDE is broken)."""
+        if not self.is_alive():
+            # Nothing of this session to close ([QUIT] is only sent to the process started by the session).
+            self.shutdown_server()
+            return
+        try:
+            self.exec("[QUIT]")
+            self.process.wait(timeout)
+        except (SolverError, subprocess.TimeoutExpired):
+            self.kill()
+            raise SolverError("O EES não fechou corretamente e foi finalizado.")
+        self.shutdown_server()
+
+    def kill(self):
+        """Shutsdown DDE server and the EES process of this session, so the session can be restarted."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.shutdown_server()
+
+    def shutdown_server(self):
+        """Shuts down the DDE server of the session (once)."""
+        if self.server is not None:
+            self.server.Shutdown()
+            self.server = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+
+class HeadlessBackend:
+    """Pure Python stand-in for EES. Runs the same macros and DDE commands on a Python model function.
+
+    The model function receives a dict with the imported variables and returns a dict with the computed
+    variables. If it raises, the solve is considered as not converged and the unsolved variables keep
+    EES default guess value (1). Solve and startup latencies (in seconds) emulate the real solver cost.
+    solve_latency can also be a function of (inputs, guesses), where guesses are the variables stored by
+    the last UpdateGuesses ({} if none), to emulate the effect of good guess values on convergence time.
+    """
+
+    # Each session has its own interpreter, usable from any thread.
+    concurrent_sessions = True
+
+    def __init__(self, model_function, solve_latency=0.0, startup_latency=0.0):
+        self.model_function = model_function
+        self.solve_latency = solve_latency
+        self.startup_latency = startup_latency
+
+    def run_macro(self, macro_filepath):
+        """Interprets the macro file (.emf) line by line."""
+
+        time.sleep(self.startup_latency)
+        interpreter = HeadlessEES(self)
+        with open(macro_filepath, 'r') as emffile:
+            for line in emffile:
+                if interpreter.run_command(line) == 'quit':
+                    break
+
+    async def run_macro_async(self, macro_filepath):
+        """Same as run_macro, but latencies are awaited (so it can run concurrently and be cancelled)."""
+
+        await asyncio.sleep(self.startup_latency)
+        interpreter = HeadlessEES(self)
+        with open(macro_filepath, 'r') as emffile:
+            lines = emffile.readlines()
+
+        for line in lines:
+            if line.strip().lower() == 'solve':
+                await asyncio.sleep(interpreter.latency())
+                interpreter.evaluate()
+            elif interpreter.run_command(line) == 'quit':
+                break
+
+    def open_session(self, server_name="PyhtonDDExyUiosdjU"):
+        return HeadlessSession(self, server_name)
+
+
+class HeadlessSession:
+    """DDE-like session with a HeadlessEES interpreter. Has its own private clipboard."""
+
+    def __init__(self, backend, server_name="PyhtonDDExyUiosdjU"):
+        self.backend = backend
+        self.server_name = server_name
+        self.clipboard = ''
+        self.interpreter = None
+
+    def start(self, timeout=60, poll_interval=0.5):
+        if self.backend.startup_latency > timeout:
+            time.sleep(timeout)
+            raise SolverError(f"O EES não respondeu via DDE em {timeout} s.")
+        time.sleep(self.backend.startup_latency)
+        self.interpreter = HeadlessEES(self.backend, session=self)
+
+    def exec(self, command):
+        if self.interpreter is None:
+            raise SolverError("A sessão não foi iniciada.")
+
+        command = command.strip()
+        if command.startswith('[') and command.endswith(']'):
+            command = command[1:-1]
+
+        if self.interpreter.run_command(command) == 'quit':
+            self.interpreter = None
+
+    def copy(self, text):
+        self.clipboard = text
+
+    def paste(self):
+        return self.clipboard
+
+    def close(self, timeout=30):
+        self.exec("[QUIT]")
+
+    def kill(self):
+        self.interpreter = None
+
+    def is_alive(self):
+        return self.interpreter is not None
+
+
+class HeadlessEES:
+    """Interpreter of the subset of EES macro/DDE commands generated by this package.
+
+    Supported: Open, Units, HideWindow, Import, Solve, UpdateGuesses, Export, SaveArrays and Quit.
+    """
+
+    file_command = re.compile(r"^(\w+)\s+'([^']*)'\s*(.*)$")
+
+    def __init__(self, backend, session=None):
+        self.backend = backend
+        self.session = session
+        self.EES_model = None
+        self.inputs = {}
+        self.results = {}
+        self.guesses = {}
+
+    def run_command(self, command):
+        """Runs one command. Returns 'quit' when the interpreter should stop."""
+
+        command = command.strip()
+        if not command or command.startswith('//'):
+            return None
+
+        name = command.split()[0].lower()
+        if name == 'quit':
+            return 'quit'
+        elif name == 'open':
+            self.EES_model = command[len('open'):].strip().strip("'")
+            self.inputs = {}
+            self.results = {}
+            self.guesses = {}
+        elif name == 'updateguesses':
+            self.guesses = {**self.inputs, **self.results}
+        elif name == 'solve':
+            self.solve()
+        elif name in ('import', 'export', 'savearrays'):
+            match = self.file_command.match(command)
+            if not match:
+                raise SolverError(f"Comando inválido: {command}")
+            _, target, args = match.groups()
+            {'import': self.import_values, 'export': self.export_values, 'savearrays': self.save_arrays}[name](target, args)
+        elif name in ('units', 'hidewindow'):
+            pass
+        else:
+            raise SolverError(f"Comando não suportado: {command}")
+        return None
+
+    def import_values(self, target, args):
+        names = args.split()
+        values = self.read(target).split()
+        for name, value in zip(names, values):
+            self.inputs.update({name: float(value)})
+
+    def export_values(self, target, args):
+        values = [f'{self.value_of(name):.8E}' for name in args.split()]
+        if target.lower() == 'clipboard':
+            self.write(target, '\t'.join(values))
+        else:
+            self.write(target, '\t'.join(values) + '\n')
+
+    def save_arrays(self, target, args):
+        """Writes current variables in the same layout of EES arrays CSV (see utilities.cleanup_csv)."""
+        filepath = args.split("'")[1] if "'" in args else args.split()[0]
+        variables = {**self.inputs, **self.results}
+        content = '\t'.join(variables.keys()) + '\n'
+        content += ','.join(str(v) for v in variables.values()) + '\n'
+        self.write(filepath, content)
+
+    def solve(self):
+        time.sleep(self.latency())
+        self.evaluate()
+
+    def latency(self):
+        latency = self.backend.solve_latency
+        if callable(latency):
+            latency = latency(dict(self.inputs), dict(self.guesses))
+        return latency
+
+    def evaluate(self):
+        try:
+            self.results = dict(self.backend.model_function(dict(self.inputs)))
+        except Exception:
+            # Not converged.
+            self.results = {}
+
+    def value_of(self, name):
+        if name in self.results:
+            return self.results[name]
+        if name in self.inputs:
+            return self.inputs[name]
+        return 1.0
+
+    def read(self, target):
+        if target.lower() == 'clipboard':
+            return self.session.paste()
+        with open(target, 'r') as datfile:
+            return datfile.read()
+
+    def write(self, target, content):
+        if target.lower() == 'clipboard':
+            self.session.copy(content)
+            return
+        with open(target, 'w') as datfile:
+            datfile.write(content)
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import shutil
+import threading
+import numpy as np
+from .utilities import check_model_path, add_folder, not_converged
+from .backends import EESBackend
+from .workers import WorkerPool
+from .macros import import_solve_export
+from .catalog import record_run
+
+
+class BatchStudy:
+    """Base of the studies that solve a matrix of points in batches (see FactorialStudy and DOEStudy).
+
+    Each batch takes the next batch_size points and writes their input DAT files to a batch folder; each point
+    exports its outputs to its own OUTPUT file, so a point that fails cannot shift the others (the price is one
+    transient input/output file pair per point, limited to the batches in flight). Batches run as chunks
+    on the worker pool (a new solver process each), are parsed straight into the preallocated values array (points
+    x outputs, NaN if not solved or not converged) and their folder is removed. Subclasses give the values of the
+    studied variables (variable_values).
+    """
+
+    folder_name = '.BatchAnalysis'
+    run_type = 'batch'
+
+    def __init__(self, EES_exe, EES_model, base_case_inputs, variables, outputs, n_points, run_id=None, backend=None,
+                 workers=1, batch_size=500, catalog=None):
+        self.EES_exe = EES_exe
+        self.catalog = catalog
+        self.backend = backend if backend else EESBackend(EES_exe)
+        self.EES_model = check_model_path(EES_model)
+        self.base_case_inputs = base_case_inputs
+        self.variables = list(variables)
+        self.outputs = outputs
+        self.workers = workers
+        self.batch_size = max(1, int(batch_size))
+        self.run_id = str(run_id) if run_id else str(round(time.time()))
+        self.paths = self.set_paths(self.EES_model)
+        self.input_names = list(base_case_inputs.keys()) + [v for v in self.variables if v not in base_case_inputs]
+        self.n_points = int(n_points)
+        self.values = np.full((self.n_points, len(self.outputs)), np.nan)
+        self.batches = []
+        self.next_index = 0
+        self.batch_lock = threading.Lock()
+
+    def set_paths(self, EES_model):
+        """Set paths that will be used as a dictionary and creats them if not already."""
+
+        model_folder = os.path.dirname(EES_model)
+        model_filename = os.path.basename(EES_model)
+        base_folder = os.path.join(
+            model_folder,
+            '.'.join(model_filename.split('.')[:-1]),
+            self.folder_name,
+            self.run_id
+        )
+        paths = {
+            'model_path': EES_model,
+            'model_folder': model_folder,
+            'base_folder': base_folder,
+            'results': os.path.join(base_folder, '.results'),
+            'batches': os.path.join(base_folder, '.batches'),
+        }
+
+        for _, path in paths.items():
+            if not os.path.exists(path):
+                os.makedirs(path)
+        return paths
+
+    def execute(self):
+        """Solves every point. Returns the result of the study (see get_result)."""
+
+        config = {
+            'variables': self.variables,
+            'outputs': list(self.outputs),
+            'points': self.n_points,
+            'workers': self.workers,
+            'batch_size': self.batch_size,
+        }
+        artifacts = {'folder': self.paths['base_folder'], 'results': self.paths['results']}
+        with record_run(self.catalog, self.run_type, self.run_id, self.EES_model, inputs=self.base_case_inputs,
+                        config=config, artifacts=artifacts) as run:
+            self.start_time = time.time()
+            self.pool = WorkerPool(self.backend, self.EES_model, self.paths['base_folder'], self.workers)
+            self.pool.run_chunks(self.next_batch, self.batch_done)
+            self.save()
+            run['summary'] = {'solved': int(sum(batch.get('solved', 0) for batch in self.batches))}
+            return self.get_result()
+
+    def variable_values(self, start, stop):
+        """Values of the studied variables (points x variables) of the points [start, stop)."""
+
+        raise NotImplementedError
+
+    def get_result(self):
+        return self.values
+
+    def batch_inputs(self, start, stop):
+        """Input matrix (points x input_names) of the points [start, stop): base case plus the studied variables."""
+
+        matrix = np.empty((stop - start, len(self.input_names)))
+        for k, variable in enumerate(self.input_names):
+            if variable not in self.variables:
+                matrix[:, k] = float(self.base_case_inputs[variable])
+        variable_values = self.variable_values(start, stop)
+        for k, variable in enumerate(self.variables):
+            matrix[:, self.input_names.index(variable)] = variable_values[:, k]
+        return matrix
+
+    def next_batch(self):
+        """Writes the input DAT files of the next batch and builds its macro string. Returns (batch id, macro string)
+        or None when all points were dispatched. Called by the workers as they get free.
+        """
+
+        with self.batch_lock:
+            if self.next_index >= self.n_points:
+                return None
+            start = self.next_index
+            stop = min(start + self.batch_size, self.n_points)
+            self.next_index = stop
+            batch_id = len(self.batches)
+            folder = add_folder(self.paths['batches'], f'batch_{batch_id + 1}')
+            self.batches.append({'start': start, 'stop': stop, 'folder': folder})
+
+        macro_string = ''
+        for k, row in enumerate(self.batch_inputs(start, stop)):
+            input_filepath = os.path.join(folder, f'input_{k + 1}.dat')
+            with open(input_filepath, 'w') as datfile:
+                datfile.write(' '.join([repr(value) for value in row.tolist()]))
+            macro_string += import_solve_export(input_filepath, self.input_names, self.output_filepath(folder, k),
+                                                self.outputs)
+        return batch_id, macro_string
+
+    def output_filepath(self, folder, k):
+        return os.path.join(folder, f'OUTPUT_{k + 1}.DAT')
+
+    def batch_done(self, batch_id, elapsed):
+        """Parses the OUTPUT files of the batch into the values array and removes the batch folder. Points without a
+        complete export or that have not converged (see utilities.not_converged) stay NaN.
+        """
+
+        batch = self.batches[batch_id]
+        batch['elapsed'] = elapsed
+
+        solved = 0
+        for k in range(batch['stop'] - batch['start']):
+            filepath = self.output_filepath(batch['folder'], k)
+            if not os.path.exists(filepath):
+                continue
+            with open(filepath, 'r') as datfile:
+                row = datfile.read().split()[:len(self.outputs)]
+            try:
+                if len(row) < len(self.outputs) or not_converged(row):
+                    continue
+            except ValueError:
+                continue
+            self.values[batch['start'] + k] = np.array(row, dtype=float)
+            solved += 1
+        batch['solved'] = solved
+
+        shutil.rmtree(batch['folder'], ignore_errors=True)
+
+    def metadata(self):
+        return {
+            'model_path': self.EES_model,
+            'base_case_inputs': self.base_case_inputs,
+            'outputs': list(self.outputs),
+            'points': self.n_points,
+            'solved': int(sum(batch.get('solved', 0) for batch in self.batches)),
+            'elapsed': time.time() - self.start_time,
+        }
+
+    def save(self):
+        """Saves the run metadata (JSON). Subclasses also save their result arrays."""
+
+        with open(os.path.join(self.paths['results'], 'metadata.json'), 'w') as jsonfile:
+            json.dump(self.metadata(), jsonfile, indent=4)
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from .utilities import get_base_folder, add_folder
+
+
+_model_hashes = {}
+
+
+def model_hash(EES_model):
+    """SHA-256 of the model file content. Cached while the file size and modification time do not change."""
+
+    stat = os.stat(EES_model)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    cached = _model_hashes.get(EES_model)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    sha = hashlib.sha256()
+    with open(EES_model, 'rb') as modelfile:
+        for block in iter(lambda: modelfile.read(1 << 20), b''):
+            sha.update(block)
+    _model_hashes[EES_model] = (signature, sha.hexdigest())
+    return sha.hexdigest()
+
+
+class EvaluationCache:
+    """Persistent cache of model evaluations (SQLite) with an in-memory LRU tier in front of it.
+
+    Entries are keyed on the hash of the model file plus the full input vector rounded to `digits`
+    decimal places, so editing the model invalidates its entries automatically. The whole output dict
+    is stored; a lookup only hits if every requested output is available.
+    """
+
+    def __init__(self, filepath, digits=8, memory_size=4096):
+        self.filepath = filepath
+        self.digits = digits
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self.connection = sqlite3.connect(filepath, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS evaluations ('
+            'key TEXT PRIMARY KEY, model_path TEXT, model_hash TEXT, inputs TEXT, outputs TEXT, created REAL)'
+        )
+        self.connection.commit()
+
+    @classmethod
+    def for_model(cls, EES_model, **kwargs):
+        """Cache stored next to the model results (<model>/.cache/evaluations.sqlite)."""
+
+        folder = add_folder(get_base_folder(EES_model), '.cache')
+        return cls(os.path.join(folder, 'evaluations.sqlite'), **kwargs)
+
+    def rounded(self, inputs):
+        rounded_inputs = {}
+        for variable, value in inputs.items():
+            try:
+                rounded_inputs[variable] = round(float(value), self.digits) + 0.0
+            except (TypeError, ValueError):
+                rounded_inputs[variable] = str(value)
+        return rounded_inputs
+
+    def key(self, EES_model, inputs):
+        content = json.dumps([model_hash(EES_model), self.rounded(inputs)], sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, EES_model, inputs, outputs):
+        """Returns the cached output dict (restricted to outputs) or None."""
+
+        key = self.key(EES_model, inputs)
+        with self.lock:
+            output_dict = self.memory.get(key)
+            if output_dict is not None:
+                self.memory.move_to_end(key)
+                tier = 'memory_hits'
+            else:
+                row = self.connection.execute('SELECT outputs FROM evaluations WHERE key = ?', (key,)).fetchone()
+                output_dict = json.loads(row[0]) if row else None
+                if output_dict is not None:
+                    self.remember(key, output_dict)
+                tier = 'disk_hits'
+
+            if output_dict is None or any(output not in output_dict for output in outputs):
+                self.stats['misses'] += 1
+                return None
+
+            self.stats[tier] += 1
+            return {output: output_dict[output] for output in outputs}
+
+    def set(self, EES_model, inputs, output_dict):
+        key = self.key(EES_model, inputs)
+        with self.lock:
+            stored = self.memory.get(key)
+            if stored is None:
+                row = self.connection.execute('SELECT outputs FROM evaluations WHERE key = ?', (key,)).fetchone()
+                stored = json.loads(row[0]) if row else {}
+            output_dict = {**stored, **output_dict}
+            self.remember(key, output_dict)
+            self.connection.execute(
+                'INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?)',
+                (key, EES_model, model_hash(EES_model), json.dumps(self.rounded(inputs)), json.dumps(output_dict),
+                 time.time())
+            )
+            self.connection.commit()
+
+    def remember(self, key, output_dict):
+        self.memory[key] = output_dict
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def invalidate_stale(self, EES_model):
+        """Deletes entries of this model path that were computed with a previous version of the file."""
+
+        with self.lock:
+            self.connection.execute(
+                'DELETE FROM evaluations WHERE model_path = ? AND model_hash != ?',
+                (EES_model, model_hash(EES_model))
+            )
+            self.connection.commit()
+
+    def hit_rate(self):
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def report(self):
+        return {**self.stats, 'hit_rate': self.hit_rate()}
+
+    def close(self):
+        self.connection.close()
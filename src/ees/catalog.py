@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from .cache import model_hash
+from .utilities import get_base_folder
+
+
+RUN_FOLDERS = {
+    'solver': '.solver',
+    'parametric': '.ParamAnalysis',
+    'opt': '.opt',
+    'optParamAnalysis': '.optParamAnalysis',
+    'factorial': '.FactorialAnalysis',
+    'doe': '.DOEAnalysis',
+}
+
+
+class RunCatalog:
+    """SQLite index of every run (solver, parametric, opt, optParamAnalysis, factorial and doe).
+
+    Each run has its type, run ID, model (path, base folder and hash), inputs, config, status (running, done or
+    failed), timings, target (variable and value), a summary of its results and the paths of its artifacts, so
+    runs can be found by a query instead of walking the result folders.
+    """
+
+    columns = ['id', 'run_type', 'run_id', 'model_path', 'base_folder', 'model_hash', 'parent', 'inputs', 'config',
+               'status', 'started', 'finished', 'elapsed', 'target_variable', 'target_value', 'summary', 'artifacts']
+    json_columns = ('inputs', 'config', 'summary', 'artifacts')
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filepath, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS runs ('
+            'id INTEGER PRIMARY KEY, run_type TEXT, run_id TEXT, model_path TEXT, base_folder TEXT, model_hash TEXT, '
+            'parent TEXT, inputs TEXT, config TEXT, status TEXT, started REAL, finished REAL, elapsed REAL, '
+            'target_variable TEXT, target_value REAL, summary TEXT, artifacts TEXT, '
+            'UNIQUE (run_type, base_folder, run_id))'
+        )
+        for index in ('run_type, started', 'base_folder, run_type', 'model_hash', 'target_variable, target_value',
+                      'parent'):
+            name = 'runs_' + index.replace(', ', '_')
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON runs ({index})')
+        self.connection.commit()
+
+    @classmethod
+    def default(cls):
+        """Catalog shared by all models: $EES_CATALOG or ~/.ees/catalog.sqlite."""
+
+        filepath = os.environ.get('EES_CATALOG', os.path.join(os.path.expanduser('~'), '.ees', 'catalog.sqlite'))
+        if not os.path.exists(os.path.dirname(filepath)):
+            os.makedirs(os.path.dirname(filepath))
+        return cls(filepath)
+
+    def start(self, run_type, run_id, EES_model, inputs=None, config=None, parent=None, artifacts=None):
+        """Records a new run (status running). A run with the same type, model and run ID is replaced.
+        Returns the row id.
+        """
+
+        with self.lock:
+            cursor = self.connection.execute(
+                'INSERT OR REPLACE INTO runs (run_type, run_id, model_path, base_folder, model_hash, parent, inputs, '
+                'config, status, started, artifacts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (run_type, str(run_id), EES_model, get_base_folder(EES_model),
+                 model_hash(EES_model) if os.path.exists(EES_model) else None, parent, dumps(inputs), dumps(config),
+                 'running', time.time(), dumps(artifacts))
+            )
+            self.connection.commit()
+            return cursor.lastrowid
+
+    def finish(self, row_id, status='done', **fields):
+        """Sets the final status and timings of the run, plus any of target_variable, target_value, summary and
+        artifacts.
+        """
+
+        with self.lock:
+            started = self.connection.execute('SELECT started FROM runs WHERE id = ?', (row_id,)).fetchone()[0]
+        finished = time.time()
+        self.update(row_id, status=status, finished=finished, elapsed=finished - started, **fields)
+
+    def update(self, row_id, **fields):
+        names = [name for name in fields if name in self.columns and name != 'id']
+        values = [dumps(fields[name]) if name in self.json_columns else fields[name] for name in names]
+        with self.lock:
+            self.connection.execute(
+                f'UPDATE runs SET {", ".join(f"{name} = ?" for name in names)} WHERE id = ?', (*values, row_id)
+            )
+            self.connection.commit()
+
+    @contextmanager
+    def record(self, run_type, run_id, EES_model, **fields):
+        """Records the run of the with block. The yielded dict can get status, target_variable, target_value,
+        summary and artifacts, saved when the block ends (status failed if it raises).
+        """
+
+        run = {'id': self.start(run_type, run_id, EES_model, **fields)}
+        try:
+            yield run
+        except BaseException:
+            self.finish(run['id'], 'failed', **{k: v for k, v in run.items() if k not in ('id', 'status')})
+            raise
+        self.finish(run['id'], **{k: v for k, v in run.items() if k != 'id'})
+
+    def find(self, run_type=None, model=None, status=None, target_variable=None, parent=None, since=None,
+             until=None, order_by='started', descending=True, limit=None):
+        """Runs matching all the given filters (model is the model path or its base folder), as dicts."""
+
+        conditions = []
+        parameters = []
+        for column, value in (('run_type', run_type), ('status', status), ('target_variable', target_variable),
+                              ('parent', parent)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                parameters.append(value)
+        if model is not None:
+            conditions.append('(model_path = ? OR base_folder = ?)')
+            parameters.extend([os.path.abspath(model)] * 2)
+        if since is not None:
+            conditions.append('started >= ?')
+            parameters.append(since)
+        if until is not None:
+            conditions.append('started <= ?')
+            parameters.append(until)
+        if order_by not in self.columns:
+            raise ValueError(f"Coluna inválida: {order_by}")
+
+        query = 'SELECT * FROM runs'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += f' ORDER BY {order_by} {"DESC" if descending else "ASC"}'
+        if limit is not None:
+            query += f' LIMIT {int(limit)}'
+
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [self.to_dict(row) for row in rows]
+
+    def best(self, target_variable, problem='max', **filters):
+        """Finished run with the best target value (or None)."""
+
+        runs = self.find(target_variable=target_variable, status='done', order_by='target_value',
+                         descending=problem.lower() == 'max', limit=1, **filters)
+        return runs[0] if runs else None
+
+    def latest(self, run_type, model=None, **filters):
+        """Most recently started run of a type (or None)."""
+
+        runs = self.find(run_type=run_type, model=model, limit=1, **filters)
+        return runs[0] if runs else None
+
+    def to_dict(self, row):
+        run = dict(zip(self.columns, row))
+        for name in self.json_columns:
+            run[name] = json.loads(run[name]) if run[name] else None
+        return run
+
+    def scan(self, base_folder):
+        """Adds the runs found in the result folders of a model (base folder: model path without extension) that
+        are not in the catalog yet, e.g. runs made before it existed. Returns the number of runs added.
+        """
+
+        model_path = next(
+            (os.path.join(os.path.dirname(base_folder), name) for name in os.listdir(os.path.dirname(base_folder))
+             if os.path.splitext(name)[0] == os.path.basename(base_folder) and os.path.isfile(
+                os.path.join(os.path.dirname(base_folder), name))),
+            base_folder + '.EES'
+        )
+
+        added = 0
+        for run_type, folder_name in RUN_FOLDERS.items():
+            runs_folder = os.path.join(base_folder, folder_name)
+            if not os.path.isdir(runs_folder):
+                continue
+            known = {run['run_id'] for run in self.find(run_type=run_type, model=base_folder)}
+            for run_id in os.listdir(runs_folder):
+                run_folder = os.path.join(runs_folder, run_id)
+                if run_id in known or not os.path.isdir(run_folder) or run_id.startswith('.'):
+                    continue
+                with self.lock:
+                    self.connection.execute(
+                        'INSERT INTO runs (run_type, run_id, model_path, base_folder, status, started, artifacts) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (run_type, run_id, model_path, base_folder, 'unknown', os.path.getmtime(run_folder),
+                         dumps({'folder': run_folder}))
+                    )
+                    self.connection.commit()
+                added += 1
+        return added
+
+    def close(self):
+        self.connection.close()
+
+
+def dumps(value):
+    # NumPy scalars (e.g. the values of parametric_inputs) are stored as numbers.
+    return json.dumps(value, default=lambda v: v.item() if hasattr(v, 'item') else str(v)) if value is not None else None
+
+
+@contextmanager
+def record_run(catalog, run_type, run_id, EES_model, **fields):
+    """Same as catalog.record, doing nothing if catalog is None."""
+
+    if catalog is None:
+        yield {}
+        return
+    with catalog.record(run_type, run_id, EES_model, **fields) as run:
+        yield run
@@ -0,0 +1,182 @@
+import os
+import numpy as np
+from .batchstudy import BatchStudy
+
+
+# Primitive polynomials (degree s, coefficients a) and initial direction numbers m of the Sobol sequence for
+# dimensions 2 to 21 (Joe & Kuo, new-joe-kuo-6.21201). The first dimension uses m = 1 for every bit.
+SOBOL_PARAMETERS = [
+    (1, 0, [1]),
+    (2, 1, [1, 3]),
+    (3, 1, [1, 3, 1]),
+    (3, 2, [1, 1, 1]),
+    (4, 1, [1, 1, 3, 3]),
+    (4, 4, [1, 3, 5, 13]),
+    (5, 2, [1, 1, 5, 5, 17]),
+    (5, 4, [1, 1, 5, 5, 5]),
+    (5, 7, [1, 1, 7, 11, 19]),
+    (5, 11, [1, 1, 5, 1, 1]),
+    (5, 13, [1, 1, 1, 3, 11]),
+    (5, 14, [1, 3, 5, 5, 31]),
+    (6, 1, [1, 3, 3, 9, 7, 49]),
+    (6, 13, [1, 1, 1, 15, 21, 21]),
+    (6, 16, [1, 3, 1, 13, 27, 49]),
+    (6, 19, [1, 1, 1, 15, 7, 5]),
+    (6, 22, [1, 3, 1, 15, 13, 25]),
+    (6, 25, [1, 1, 5, 5, 19, 61]),
+    (7, 1, [1, 3, 7, 11, 23, 15, 103]),
+    (7, 4, [1, 3, 7, 13, 13, 15, 69]),
+]
+SOBOL_BITS = 30
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97]
+
+
+def latin_hypercube(n_samples, n_dimensions, rng):
+    """Latin hypercube in [0, 1)^d: each dimension has exactly one sample in each of the n_samples strata."""
+
+    strata = np.column_stack([rng.permutation(n_samples) for _ in range(n_dimensions)])
+    return (strata + rng.random((n_samples, n_dimensions))) / n_samples
+
+
+def sobol_direction_numbers(n_dimensions):
+    """Direction numbers (dimensions x bits) as integers with SOBOL_BITS bits."""
+
+    if n_dimensions > len(SOBOL_PARAMETERS) + 1:
+        raise ValueError(f"Sobol implementado para até {len(SOBOL_PARAMETERS) + 1} variáveis.")
+
+    directions = np.zeros((n_dimensions, SOBOL_BITS), dtype=np.int64)
+    directions[0] = [1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]
+    for d in range(1, n_dimensions):
+        s, a, m = SOBOL_PARAMETERS[d - 1]
+        m = list(m)
+        for k in range(s, SOBOL_BITS):
+            value = m[k - s] ^ (m[k - s] << s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    value ^= m[k - j] << j
+            m.append(value)
+        directions[d] = [m[k] << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]
+    return directions
+
+
+def sobol(n_samples, n_dimensions, rng, scramble=True):
+    """Sobol sequence in [0, 1)^d (Gray code order). Balance properties hold for n_samples = 2^k.
+
+    With scramble, the direction numbers get a random linear matrix scrambling and the points a random
+    digital shift (same as scipy.stats.qmc.Sobol), so the first point is not the origin.
+    """
+
+    directions = sobol_direction_numbers(n_dimensions)
+    shift = np.zeros(n_dimensions, dtype=np.int64)
+    if scramble:
+        powers = 1 << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.int64)
+        for d in range(n_dimensions):
+            # Lower triangular binary matrix with unit diagonal, acting on the bits (most significant first).
+            matrix = np.tril(rng.integers(0, 2, (SOBOL_BITS, SOBOL_BITS)), -1) + np.eye(SOBOL_BITS, dtype=np.int64)
+            bits = (directions[d][:, None] >> np.arange(SOBOL_BITS - 1, -1, -1)) & 1
+            directions[d] = ((bits @ matrix.T) % 2) @ powers
+        shift = rng.integers(0, 1 << SOBOL_BITS, n_dimensions, dtype=np.int64)
+
+    index = np.arange(n_samples, dtype=np.int64)
+    gray = index ^ (index >> 1)
+    points = np.tile(shift, (n_samples, 1))
+    for k in range(SOBOL_BITS):
+        points ^= ((gray >> k) & 1)[:, None] * directions[:, k][None, :]
+    return points / float(1 << SOBOL_BITS)
+
+
+def halton(n_samples, n_dimensions, rng, scramble=True):
+    """Halton sequence in [0, 1)^d (radical inverse in the first d primes).
+
+    With scramble, each digit position of each dimension gets a random permutation of the digits (keeping
+    0 -> 0), which removes the correlation between the dimensions of larger primes.
+    """
+
+    if n_dimensions > len(PRIMES):
+        raise ValueError(f"Halton implementado para até {len(PRIMES)} variáveis.")
+
+    points = np.zeros((n_samples, n_dimensions))
+    index = np.arange(1, n_samples + 1)
+    for d, base in enumerate(PRIMES[:n_dimensions]):
+        remaining = index.copy()
+        factor = 1.0 / base
+        while remaining.any():
+            digits = remaining % base
+            if scramble:
+                permutation = np.concatenate([[0], rng.permutation(np.arange(1, base))])
+                digits = permutation[digits]
+            points[:, d] += digits * factor
+            remaining //= base
+            factor /= base
+    return points
+
+
+SAMPLERS = {
+    'lhs': latin_hypercube,
+    'sobol': sobol,
+    'halton': halton,
+}
+
+
+def sample(decision_variables, n_samples, method='lhs', seed=None):
+    """Space-filling samples (n_samples x variables) within the (lower, upper) bounds of decision_variables."""
+
+    if method not in SAMPLERS:
+        raise ValueError(f"Método de amostragem inválido: {method}. Opções: {', '.join(SAMPLERS)}.")
+
+    rng = np.random.default_rng(seed)
+    unit_samples = SAMPLERS[method](n_samples, len(decision_variables), rng)
+    bounds = np.array(list(decision_variables.values()), dtype=float)
+    return bounds[:, 0] + unit_samples * (bounds[:, 1] - bounds[:, 0])
+
+
+class DOEStudy(BatchStudy):
+    """Design of experiments over the bounds of the decision variables (same dict of the optimization studies).
+
+    Samples come from a Latin hypercube ('lhs'), scrambled Sobol ('sobol') or scrambled Halton ('halton')
+    design and are solved in batches around the base case (see BatchStudy).
+    """
+
+    folder_name = '.DOEAnalysis'
+    run_type = 'doe'
+
+    def __init__(self, EES_exe, EES_model, base_case_inputs, decision_variables, outputs, n_samples, method='lhs',
+                 seed=None, run_id=None, backend=None, workers=1, batch_size=500, catalog=None):
+        self.decision_variables = decision_variables
+        self.method = method
+        self.seed = seed
+        self.samples = sample(decision_variables, n_samples, method, seed)
+        super().__init__(EES_exe, EES_model, base_case_inputs, decision_variables.keys(), outputs, n_samples,
+                         run_id, backend, workers, batch_size, catalog)
+
+    def variable_values(self, start, stop):
+        return self.samples[start:stop]
+
+    def get_result(self):
+        """DataFrame with one row per sample: decision variables and outputs."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.samples, columns=self.variables)
+        for k, output in enumerate(self.outputs):
+            df[output] = self.values[:, k]
+        return df
+
+    def metadata(self):
+        return {
+            **super().metadata(),
+            'decision_variables': {variable: list(bounds) for variable, bounds in self.decision_variables.items()},
+            'method': self.method,
+            'seed': self.seed,
+        }
+
+    def save(self):
+        """Saves samples and outputs (npz) and the run metadata (JSON)."""
+
+        np.savez(
+            os.path.join(self.paths['results'], 'doe_result.npz'),
+            samples=self.samples,
+            values=self.values,
+            variables=np.array(self.variables),
+            outputs=np.array(self.outputs)
+        )
+        super().save()
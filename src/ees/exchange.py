@@ -0,0 +1,149 @@
+import os
+import hashlib
+import tempfile
+from .utilities import add_folder
+
+
+class Channel:
+    """Keeps what the session holds (held: dict of the last imported values, None if unknown), so update imports
+    only the inputs that changed. Anything that makes the state unknown (restart, reopening the model, a failed
+    exchange) must call reset, and the next update imports every input again.
+    """
+
+    held = None
+
+    def update(self, inputs):
+        """Imports the inputs dict values that differ from the held ones. Returns the number of imported values."""
+        if self.held is None:
+            changed = dict(inputs)
+        else:
+            changed = {k: v for k, v in inputs.items() if k not in self.held or self.held[k] != v}
+        if not changed:
+            return 0
+
+        try:
+            self.send(changed)
+        except BaseException:
+            self.reset()
+            raise
+        self.held = {**(self.held or {}), **changed}
+        return len(changed)
+
+    def reset(self):
+        self.held = None
+
+
+class ClipboardChannel(Channel):
+    """Moves inputs and outputs through the clipboard of the session (the system clipboard for EES).
+
+    DDE commands are limited to 255 characters, so variables are imported/exported in chunks. The
+    system clipboard is shared by every process, so this channel is not safe for concurrent sessions.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def send(self, inputs):
+        """Imports the inputs dict into EES."""
+        input_chunks = variable_dict_splitter(inputs, (254 - 35))
+        for chunk in input_chunks:
+            if not chunk:
+                continue
+            input_variables = " ".join([str(v) for v in chunk.keys()])
+            input_values = " ".join([str(v) for v in chunk.values()])
+            self.session.copy(input_values)
+            self.session.exec(f"[Import \'Clipboard\' {input_variables}]")
+            self.session.copy('')
+
+    def receive(self, outputs):
+        """Exports the outputs from EES. Returns list of strings (same order of outputs)."""
+        output_chunks = variable_list_splitter(outputs, (254 - 35))
+        results = []
+        for chunk in output_chunks:
+            if not chunk:
+                continue
+            output_variables = " ".join([str(var) for var in chunk])
+            self.session.exec(f"[Export \'Clipboard\' {output_variables}]")
+            result = self.session.paste()
+            self.session.copy('')
+
+            result = result.replace("\t", " ").replace("\r\n", " ")
+            results.extend(result.split(" "))
+        return results
+
+
+class FileChannel(Channel):
+    """Moves inputs and outputs through DAT files in a folder owned by the session.
+
+    Nothing is shared with other sessions or processes, so concurrent sessions are safe. The DDE command
+    length limit still applies to the variable names, but values never go through the command or clipboard.
+    """
+
+    # Minimum room for variable names in each Import/Export command.
+    min_names_len = 64
+
+    def __init__(self, session, folder):
+        self.session = session
+        self.folder = add_folder(folder)
+        self.max_len = self.names_len(self.folder)
+        if self.max_len < self.min_names_len:
+            # Deep run folders leave no room for the names in the 255-character DDE command: short folder in temp.
+            digest = hashlib.sha1(os.path.abspath(folder).encode()).hexdigest()[:10]
+            self.folder = add_folder(tempfile.gettempdir(), 'ees_exchange', digest)
+            self.max_len = self.names_len(self.folder)
+        if self.max_len < self.min_names_len:
+            raise ValueError(f"Caminho muito longo para os comandos DDE (máx. 255 caracteres): {self.folder}")
+
+    @staticmethod
+    def names_len(folder):
+        """Characters left for the variable names in an Import/Export command of a file in folder."""
+        return 254 - len("[Import '' ]") - len(os.path.join(folder, 'OUTPUT_00.DAT'))
+
+    def send(self, inputs):
+        """Imports the inputs dict into EES."""
+        for j, chunk in enumerate(variable_dict_splitter(inputs, self.max_len)):
+            if not chunk:
+                continue
+            filepath = os.path.join(self.folder, f'input_{j + 1}.dat')
+            with open(filepath, 'w') as datfile:
+                datfile.write(" ".join([str(v) for v in chunk.values()]))
+            self.session.exec(f"[Import \'{filepath}\' {' '.join(chunk.keys())}]")
+
+    def receive(self, outputs):
+        """Exports the outputs from EES. Returns list of strings (same order of outputs, '' if missing)."""
+        results = []
+        for j, chunk in enumerate(variable_list_splitter(outputs, self.max_len)):
+            if not chunk:
+                continue
+            filepath = os.path.join(self.folder, f'OUTPUT_{j + 1}.DAT')
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            self.session.exec(f"[Export \'{filepath}\' {' '.join(chunk)}]")
+
+            if not os.path.exists(filepath):
+                results.extend([''] * len(chunk))
+                continue
+            with open(filepath, 'r') as datfile:
+                values = datfile.read().split()
+            results.extend(values + [''] * (len(chunk) - len(values)))
+        return results
+
+
+def variable_dict_splitter(d, max_len):
+    return [{var: d[var] for var in chunk} for chunk in variable_list_splitter(list(d.keys()), max_len)]
+
+
+def variable_list_splitter(l, max_len):
+    """Splits the variable names in chunks whose names (joined by spaces) have at most max_len characters."""
+    chunks = []
+    chunk = []
+    for variable in l:
+        if len(variable) > max_len:
+            raise ValueError(f"A variável {variable} não cabe em um comando DDE ({max_len} caracteres).")
+        if chunk and len(" ".join(chunk + [variable])) > max_len:
+            chunks.append(chunk)
+            chunk = []
+        chunk.append(variable)
+    if chunk:
+        chunks.append(chunk)
+    return chunks
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+from .batchstudy import BatchStudy
+
+
+class FactorialResult:
+    """Labelled N-d array of a full-factorial study.
+
+    values has one axis per grid variable (in the order of the grid dict) plus a last axis for the outputs.
+    Points that were not solved are NaN.
+    """
+
+    def __init__(self, coords, outputs, values=None):
+        self.coords = {variable: np.asarray(grid_values) for variable, grid_values in coords.items()}
+        self.dims = list(self.coords.keys())
+        self.outputs = list(outputs)
+        self.shape = tuple(len(grid_values) for grid_values in self.coords.values())
+        if values is None:
+            values = np.full(self.shape + (len(self.outputs),), np.nan)
+        self.values = values
+
+    def output(self, name):
+        """N-d array of one output."""
+
+        return self.values[..., self.outputs.index(name)]
+
+    def sel(self, **indexers):
+        """Selects grid values (e.g. sel(MR=2.5)). Returns the remaining N-d array with the outputs axis."""
+
+        index = []
+        for variable in self.dims:
+            if variable in indexers:
+                matches = np.flatnonzero(np.isclose(self.coords[variable], indexers[variable]))
+                if not matches.size:
+                    raise KeyError(f"{variable}={indexers[variable]} não está na grade.")
+                index.append(matches[0])
+            else:
+                index.append(slice(None))
+        return self.values[tuple(index)]
+
+    def to_dataframe(self):
+        """Long format DataFrame: one row per point, with the grid variables and the outputs as columns."""
+        import pandas as pd
+
+        grids = np.meshgrid(*self.coords.values(), indexing='ij')
+        columns = {variable: grid.ravel() for variable, grid in zip(self.dims, grids)}
+        flat_values = self.values.reshape(-1, len(self.outputs))
+        columns.update({output: flat_values[:, k] for k, output in enumerate(self.outputs)})
+        return pd.DataFrame(columns)
+
+    def to_xarray(self):
+        """xarray.DataArray with dims (*grid variables, 'output'). Needs xarray installed."""
+        import xarray as xr
+
+        return xr.DataArray(self.values, coords={**self.coords, 'output': self.outputs}, dims=self.dims + ['output'])
+
+    def save(self, filepath):
+        np.savez(
+            filepath,
+            values=self.values,
+            outputs=np.array(self.outputs),
+            dims=np.array(self.dims),
+            **{f'coord_{k}': grid_values for k, grid_values in enumerate(self.coords.values())}
+        )
+        return filepath
+
+    @classmethod
+    def load(cls, filepath):
+        with np.load(filepath) as data:
+            dims = [str(dim) for dim in data['dims']]
+            coords = {dim: data[f'coord_{k}'] for k, dim in enumerate(dims)}
+            return cls(coords, [str(output) for output in data['outputs']], data['values'])
+
+
+class FactorialStudy(BatchStudy):
+    """Full-factorial (N-d grid) sweep, e.g. T[10] x T[19] x MR around the base case.
+
+    The grid is never materialised: the points of each batch come from their flat indices (see BatchStudy), and
+    the values array is a view of the N-d result array.
+    """
+
+    folder_name = '.FactorialAnalysis'
+    run_type = 'factorial'
+
+    def __init__(self, EES_exe, EES_model, base_case_inputs, grid, outputs, run_id=None, backend=None, workers=1,
+                 batch_size=500, catalog=None):
+        self.grid = {variable: np.asarray(grid_values, dtype=float) for variable, grid_values in grid.items()}
+        self.shape = tuple(len(grid_values) for grid_values in self.grid.values())
+        super().__init__(EES_exe, EES_model, base_case_inputs, self.grid.keys(), outputs, int(np.prod(self.shape)),
+                         run_id, backend, workers, batch_size, catalog)
+        self.result = FactorialResult(self.grid, self.outputs, self.values.reshape(self.shape + (len(outputs),)))
+
+    def variable_values(self, start, stop):
+        grid_indexes = np.unravel_index(np.arange(start, stop), self.shape)
+        return np.column_stack([self.grid[variable][indexes] for variable, indexes in zip(self.grid, grid_indexes)])
+
+    def get_result(self):
+        return self.result
+
+    def metadata(self):
+        return {
+            **super().metadata(),
+            'grid': {variable: grid_values.tolist() for variable, grid_values in self.grid.items()},
+        }
+
+    def save(self):
+        """Saves the result array (npz) and the run metadata (JSON)."""
+
+        self.result.save(os.path.join(self.paths['results'], 'factorial_result.npz'))
+        super().save()
@@ -0,0 +1,56 @@
+import os
+
+
+def macro_header(EES_model):
+    """First lines of every macro: opens the model and sets the units."""
+
+    macro_header = "//WINDOWSIZE 0 401 1496 317\n"
+    macro_header += f'Open \'{EES_model}\'\n'
+    macro_header += 'Units SI C kPa kJ Mass\n'
+    return macro_header
+
+
+def import_solve_export(input_filepath, input_names, output_filepath, output_names, update_guesses=False):
+    """EES commands to read inputs from DATFILE, solve and export outputs to DATFILE.
+
+    With update_guesses, the solution becomes the guess values of the next solve (continuation). Without
+    output_filepath nothing is exported (used to bring the guess values back to an already solved point).
+    """
+
+    macro_string = f'Import \'{input_filepath}\' {" ".join(input_names)}\n'
+    macro_string += 'Solve\n'
+    if update_guesses:
+        macro_string += 'UpdateGuesses\n'
+    if output_filepath:
+        macro_string += f'Export \'{output_filepath}\' {" ".join(output_names)}\n'
+    return macro_string
+
+
+def write_macro(macro_filepath, EES_model, macro_string):
+    """Adds header and footer to macro string and creates macro file (.emf). Returns its path."""
+
+    macro_string = macro_header(EES_model) + macro_string + 'Quit'
+
+    with open(macro_filepath, 'w') as emffile:
+        emffile.write(macro_string)
+
+    return macro_filepath
+
+
+def write_input_datfile(filepath, values):
+    """Creates input datfile with values separated by spaces."""
+
+    with open(filepath, 'w') as datfile:
+        datfile.write(' '.join([str(value) for value in values]))
+
+    return filepath
+
+
+def read_output_datfile(filepath):
+    """Reads output datfile exported by EES. Returns list of strings (None if the file does not exist)."""
+
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, 'r') as datfile:
+        return datfile.read().strip('\n').split('\t')
@@ -1,18 +1,10 @@
 import os
 import sys
 import math
-import plotly.io as pio
-from numpy import i0
 sys.path.append(os.path.join(os.getcwd(), 'src'))
-from utilities import get_base_folder
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.sankey import Sankey
-import plotly.graph_objects as go
+from ees.utilities import get_base_folder
 import random
 
-pio.kaleido.scope.mathjax = None
-
 
 class ModelSankey:
 
@@ -33,6 +25,8 @@ class ModelSankey:
         return paths
 
     def load_data(self) -> list:
+        import pandas as pd
+
         filename_arrays = os.path.join(self.paths.get("data"), "clean_arrays.csv")
         df_arrays = pd.read_csv(filename_arrays, delimiter=";", decimal=",")
         exergy = df_arrays["ex"]
@@ -93,6 +87,10 @@ class ModelSankey:
         return (labels, pos, source, target, value, node_colors, link_colors, annotations)
 
     def generate(self, lang: str = "pt"):
+        import plotly.graph_objects as go
+        import plotly.io as pio
+
+        pio.kaleido.scope.mathjax = None
         labels, pos, source, target, value, node_colors, link_colors, annotations = self.prepare_componentes(lang)
 
         labels = [f"<b>{label}</b>" for label in labels]
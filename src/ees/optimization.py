@@ -5,27 +5,53 @@ import math
 import time
 import logging
 import traceback
-import win32ui
-import dde
-import pyperclip
-import subprocess
-import pandas as pd
-from icecream import ic
-from rich import print
-from .utilities import check_model_path
+from .utilities import check_model_path, add_folder, not_converged, SolverError, print_rich as print
+from .backends import EESBackend
+from .workers import SessionPool, WorkerPool
+from .sessions import SessionManager
+from .exchange import ClipboardChannel, FileChannel, variable_dict_splitter, variable_list_splitter
+from .macros import import_solve_export, write_macro, write_input_datfile, read_output_datfile
 
 
 class OptimizationStudy:
 
-    def __init__(self, EES_exe, EES_model, base_case_inputs, outputs, runID=None):
+    def __init__(self, EES_exe, EES_model, base_case_inputs, outputs, runID=None, backend=None, sessions=1,
+                 evaluation="dde", exchange="file", cache=None, readable=False,
+                 catalog=None):
         self.EES_exe = EES_exe
+        self.readable = readable
+        self.catalog = catalog
+        # Run ID of the study this run is part of (e.g. OptParamAnalysis), recorded in the run catalog.
+        self.parent_run = None
+        self.cache = cache
+        self.backend = backend if backend else EESBackend(EES_exe)
+        self.n_sessions = max(1, int(sessions))
+        if evaluation not in ("dde", "batch"):
+            raise ArgumentError("Wrong evaluation value. Must be dde or batch.")
+        self.evaluation = evaluation
+        if exchange not in ("file", "clipboard"):
+            raise ArgumentError("Wrong exchange value. Must be file or clipboard.")
+        if evaluation == "dde" and self.n_sessions > 1 and not getattr(self.backend, "concurrent_sessions", False):
+            raise ArgumentError("This backend supports a single DDE session. Use evaluation='batch' for more than one "
+                                "EES process.")
+        if exchange == "clipboard" and self.n_sessions > 1:
+            raise ArgumentError("The clipboard is shared by all sessions. Use exchange='file' with more than one session.")
+        self.exchange = exchange
+        self.channels = {}
+        self.batch_results = {}
+        self.session_manager = SessionManager(self.backend)
         self.EES_model = check_model_path(EES_model)
         self.base_case_inputs = base_case_inputs
         self.outputs = outputs
+        # Outputs that must be non-negative (see set_constraints). None: all outputs, exported on every evaluation.
+        self.constraints = None
         self.runID = runID if runID else str(round(time.time()))
         self.paths = self.set_paths()
+        if self.cache is not None:
+            self.cache.invalidate_stale(self.EES_model)
         self.logger = self.setup_logging()
-        self.consecutive_error_count = 0
+        # Consecutive DDE errors of each session (by server name).
+        self.consecutive_errors = {}
         self.is_ready = {
             'target_variable': False,
             'decision_variables': False,
@@ -71,127 +97,256 @@ class OptimizationStudy:
             raise ArgumentError("Wrong problem value. Must be max or min.")
         self.is_ready['target_variable'] = True
 
+    def set_constraints(self, constraints):
+        """Declares the outputs that must be non-negative for an individual to be feasible. Evaluations then export
+        only the target and these outputs; the full outputs are exported only for the reported individuals.
+        """
+        missing = [output for output in constraints if output not in self.outputs]
+        if missing:
+            raise ArgumentError(f"Restrições que não estão nos outputs: {', '.join(missing)}.")
+        self.constraints = list(constraints)
+
+    @property
+    def evaluation_outputs(self):
+        """Outputs exported on each evaluation: all of them, or the target and the constraints if declared."""
+        if self.constraints is None:
+            return self.outputs
+        return [self.target_variable] + [output for output in self.constraints if output != self.target_variable]
+
     def set_decision_variables(self, decision_variables):
         """Adds the decision variables dict as a attribute of the class."""
         self.decision_variables = decision_variables
         self.is_ready['decision_variables'] = True
 
+    def setup_solver(self):
+        """Opens DDE sessions or, in batch evaluation mode, prepares the workers that run generation macros."""
+        if self.evaluation == "batch":
+            self.setup_batch()
+        else:
+            self.setup_DDE()
+
+    def setup_batch(self):
+        self.log(f">> Avaliação em lote com {self.n_sessions} processo(s) do EES em {self.EES_exe}")
+        self.worker_pool = WorkerPool(self.backend, self.EES_model, self.paths['id_folder'], self.n_sessions)
+        self.session_pool = SessionPool([])
+        self.is_ready['DDE'] = True
+
     def setup_DDE(self):
-        # Closes any instance of EES that are already running.
-        if "EES.exe" in str(subprocess.check_output('tasklist')):
-            self.log(">> Uma instância do EES foi encontrada aberta. Ela será fechada.")
-            os.system("taskkill /f /im  EES.exe")
+        sessions = []
+        for k in range(self.n_sessions):
+            self.log(f">> Abrindo o EES em {self.EES_exe} (sessão {k + 1}/{self.n_sessions})")
+            session = self.session_manager.start(f"PyhtonDDExyUiosdjU{k + 1}")
+            self.channels[session.server_name] = self.open_channel(session, k)
+            self.open_model(session)
+            sessions.append(session)
+        self.session_pool = SessionPool(sessions)
 
-        self.log(f">> Abrindo o EES em {self.EES_exe}")
-        subprocess.Popen([self.EES_exe, '/hide'], shell=True, close_fds=True)
-        time.sleep(15)
-        self.server = dde.CreateServer()
-        self.server.Create("PyhtonDDExyUiosdjU")
+        self.is_ready['DDE'] = True
 
-        self.connector = dde.CreateConversation(self.server)
-        self.connector.ConnectTo("EES", "DDE")
+    def open_channel(self, session, k):
+        """Data exchange channel of the k-th session."""
+        if self.exchange == "clipboard":
+            return ClipboardChannel(session)
+        return FileChannel(session, os.path.join(self.paths['id_folder'], '.exchange', f'session_{k + 1}'))
 
+    def open_model(self, session):
         self.log(f">> Abrindo modelo {self.EES_model}")
-        self.connector.Exec(f"[Open {self.EES_model}]")
-        self.connector.Exec(f"[HideWindow ErrorMessages]")
-        self.connector.Exec(f"[HideWindow WarningMessages]")
-
-        self.is_ready['DDE'] = True
+        session.exec(f"[Open {self.EES_model}]")
+        session.exec(f"[HideWindow ErrorMessages]")
+        session.exec(f"[HideWindow WarningMessages]")
+        # The model starts with no inputs: the base case is imported once, then only the decision variables.
+        channel = self.channels[session.server_name]
+        channel.reset()
+        channel.update(self.base_case_inputs)
 
     def close(self):
+        if not self.session_manager.sessions:
+            return
         self.log(">> Fechando o EES.")
-        try:
-            self.connector.Exec("[QUIT]")
-        except dde.error as e:
-            self.logger.exception(e)
-            os.system("taskkill /f /im  EES.exe")
-        self.server.Shutdown()
-        time.sleep(10)
-
-    def cleanup_dde(self):
-        """Closes DDE Server and shutsdown EES if opened, so it can be restarted."""
-        try:
-            self.server.Shutdown()
-            os.system("taskkill /f /im  EES.exe")
-            del self.connector
-            del self.server
-        except Exception as deletion_exception:
-            # A Exception could happen if the server and EES are already closed.
-            self.logger.exception(deletion_exception)
-
-    def dde_error_handler(self, error):
-        """Handles the restart of EES if DDE exec error persists."""
-        self.consecutive_error_count += 1
+        for error in self.session_manager.stop_all():
+            self.logger.exception(error)
+
+        metrics = self.session_manager.metrics()
+        self.log(
+            f">> Sessões: inicialização média {metrics['startup']['mean']:.2f} s "
+            f"(máx. {metrics['startup']['max']:.2f} s), "
+            f"fechamento médio {metrics['teardown']['mean']:.2f} s (máx. {metrics['teardown']['max']:.2f} s)"
+        )
+
+    def dde_error_handler(self, error, session):
+        """Handles the restart of the session if DDE exec error persists. Each session counts its own errors (it is
+        used by one thread at a time).
+        """
+        self.consecutive_errors[session.server_name] = self.consecutive_errors.get(session.server_name, 0) + 1
         self.log(f">> Erro: Conexão DDE falhou. A variável target para esta rodada será considerado 0.")
         self.log(traceback.format_exc(), verbose=False)
-        if self.consecutive_error_count > 2:
+        if self.consecutive_errors[session.server_name] > 2:
             self.log(">> O erro persiste. Reiniciando o EES.")
-            self.cleanup_dde()
-            self.setup_DDE()
-            self.consecutive_error_count = 0
+            self.session_manager.restart(session)
+            self.open_model(session)
+            self.consecutive_errors[session.server_name] = 0
 
     def eval_EES_model(self, individual):
+        return (self.solve_individual(individual)[self.target_variable], )
+
+    def is_valid(self, individual):
         # Remove 0 and negative values from decision variables
         for variable, limits in zip(individual, self.decision_variables.values()):
             if variable <= 0 or (variable < limits[0] or variable > limits[1]):
-                return (self.invalid_target_value, )
-
+                return False
+        return True
+
+    def solve_individual(self, individual, outputs=None):
+        """Solves the model for the individual on the session of the current thread, exporting outputs
+        (evaluation_outputs if None). Returns output dict.
+        """
+        outputs = outputs if outputs is not None else self.evaluation_outputs
+        if not self.is_valid(individual):
+            return {self.target_variable: self.invalid_target_value}
+
+        output_dict = self.cached_output(individual, outputs)
+        if output_dict is not None:
+            return output_dict
+
+        if self.evaluation == "batch":
+            if tuple(individual) not in self.batch_results or outputs != self.evaluation_outputs:
+                self.solve_batch([individual], outputs)
+            return self.batch_results[tuple(individual)]
+
+        session = self.session_pool.current()
         try:
-            self.prepare_inputs(individual)
-            self.connector.Exec('[SOLVE]')
-            target_variable = self.get_output()
-            self.consecutive_error_count = 0
-        except dde.error as e:
-            self.dde_error_handler(e)
-            target_variable = self.invalid_target_value
-
-        return (target_variable, )
-
-    def prepare_inputs(self, individual):
+            self.prepare_inputs(individual, session)
+            session.exec('[SOLVE]')
+            output_dict = self.get_output(session, outputs)
+            self.consecutive_errors[session.server_name] = 0
+            self.store_output(individual, output_dict)
+        except SolverError as e:
+            # What EES holds is unknown after the error, the next individual imports every input again.
+            self.channels[session.server_name].reset()
+            self.dde_error_handler(e, session)
+            output_dict = {self.target_variable: self.invalid_target_value}
+
+        return output_dict
+
+    def full_output(self, individual):
+        """Output dict of the individual with all outputs. If the evaluation exported only some of them
+        (individual.outputs), the individual is solved again exporting all outputs.
+        """
+        output_dict = getattr(individual, "outputs", None)
+        if output_dict is not None and all(output in output_dict for output in self.outputs):
+            return output_dict
+        return self.solve_individual(individual, self.outputs)
+
+    def cached_output(self, individual, outputs=None):
+        """Output dict of the individual from the evaluation cache (None if not cached or cache disabled)."""
+        if self.cache is None:
+            return None
+        outputs = outputs if outputs is not None else self.evaluation_outputs
+        output_dict = self.cache.get(self.EES_model, self.individual_inputs(individual), outputs)
+        # Entries stored by other studies (e.g. parametric sweeps) are validated like a solve.
+        if output_dict is not None and not_converged(output_dict.values()):
+            return None
+        return output_dict
+
+    def store_output(self, individual, output_dict):
+        """Stores a valid output dict in the evaluation cache."""
+        if self.cache is None or output_dict[self.target_variable] == self.invalid_target_value:
+            return
+        self.cache.set(self.EES_model, self.individual_inputs(individual), output_dict)
+
+    def batch_map(self, function, items):
+        """Same as builtin map, but all valid individuals are solved beforehand in a single macro run."""
+        items = list(items)
+        self.solve_batch([ind for ind in items if self.is_valid(ind)])
+        try:
+            return [function(item) for item in items]
+        finally:
+            self.batch_results = {}
+
+    def solve_batch(self, individuals, outputs=None):
+        """Writes numbered input DAT files, solves them with one macro per worker and reads the outputs
+        (evaluation_outputs if None) back.
+        """
+        outputs = outputs if outputs is not None else self.evaluation_outputs
+        unique_inds = []
+        for ind in {tuple(ind): ind for ind in individuals}.values():
+            output_dict = self.cached_output(ind, outputs)
+            if output_dict is not None:
+                self.batch_results[tuple(ind)] = output_dict
+            else:
+                unique_inds.append(ind)
+        if not unique_inds:
+            return
+        self.log(f">> Resolvendo lote de {len(unique_inds)} indivíduos", verbose=False)
+
+        output_filepaths = []
+        macro_filepaths = []
+        i = 0
+        for worker, shard in zip(self.worker_pool.workers, self.worker_pool.shard(unique_inds)):
+            datfiles_folder = add_folder(worker['folder'], '.datfiles')
+            macro_string = ''
+            for ind in shard:
+                i += 1
+                input_filepath = write_input_datfile(
+                    os.path.join(datfiles_folder, f'input_{i}.dat'),
+                    self.individual_inputs(ind).values()
+                )
+                output_filepath = os.path.join(datfiles_folder, f'OUTPUT_{i}.DAT')
+                if os.path.exists(output_filepath):
+                    os.remove(output_filepath)
+                output_filepaths.append(output_filepath)
+                macro_string += import_solve_export(input_filepath, self.base_case_inputs.keys(),
+                                                    output_filepath, outputs)
+            macro_filepaths.append(write_macro(os.path.join(worker['folder'], 'macro.emf'), worker['model'], macro_string))
+
+        self.worker_pool.run(macro_filepaths)
+
+        for ind, output_filepath in zip(unique_inds, output_filepaths):
+            results = read_output_datfile(output_filepath)
+            if results is None:
+                self.log(">> Erro: O EES não exportou o arquivo de saída. O indivíduo é inválido.")
+                self.batch_results[tuple(ind)] = {self.target_variable: self.invalid_target_value}
+            else:
+                self.batch_results[tuple(ind)] = self.parse_output(results, outputs)
+                self.store_output(ind, self.batch_results[tuple(ind)])
+
+    def individual_inputs(self, individual):
+        """Base case inputs updated with the decision variables values of the individual."""
         new_inputs = {}
         new_inputs.update(self.base_case_inputs)
         for (variable, _), ind_variable_value in zip(self.decision_variables.items(), individual):
             new_inputs.update({variable: ind_variable_value})
+        return new_inputs
+
+    def prepare_inputs(self, individual, session):
+        """Imports the inputs of the individual that differ from what the session holds (the decision variables)."""
+        self.channels[session.server_name].update(self.individual_inputs(individual))
+
+    def get_output(self, session, outputs=None):
+        outputs = outputs if outputs is not None else self.evaluation_outputs
+        return self.parse_output(self.channels[session.server_name].receive(outputs), outputs)
 
-        input_chunks = OptimizationStudy.variable_dict_splitter(new_inputs, (254 - 35))
-        for chunk in input_chunks:
-            input_variables = " ".join([str(v) for v in chunk.keys()])
-            input_values = " ".join([str(v) for v in chunk.values()])
-            pyperclip.copy(input_values)
-            self.connector.Exec(f"[Import \'Clipboard\' {input_variables}]")
-            pyperclip.copy('')
-
-    def get_output(self):
-        output_chunks = OptimizationStudy.variable_list_splitter(self.outputs, (254 - 35))
-        results = []
+    def parse_output(self, results, outputs=None):
+        """Turns the exported strings (of outputs, all outputs if None) into output dict. Invalidates the target if
+        EES has not converged.
+        """
         error_has_ocorred = False
-        for chunk in output_chunks:
-            output_variables = " ".join([str(var) for var in chunk])
-            self.connector.Exec(f"[Export \'Clipboard\' {output_variables}]")
-            result = pyperclip.paste()
-            pyperclip.copy('')
-
-            result = result.replace("\t", " ").replace("\r\n", " ")
-            results.extend(result.split(" "))
-
-        self.output_dict = {}
-        error_count = 0
-        for output, result in zip(self.outputs, results):
+        output_dict = {}
+        for output, result in zip(outputs if outputs is not None else self.outputs, results):
             try:
                 value = float(result)
-                # Prevents EES from returning values of a run thar has not converged. I.E. some variables have their guess value.
-                if result == "1.00000000E+00":
-                    error_count += 1
             except ValueError:
                 value = 0
                 error_has_ocorred = True
-            self.output_dict.update({output: value})
+            output_dict.update({output: value})
 
-        if error_has_ocorred or error_count > 3:
+        # Prevents EES from returning values of a run that has not converged, i.e. the variables have their guess
+        # value. The threshold depends on how many outputs were exported (see set_constraints).
+        if error_has_ocorred or not_converged(output_dict.values()):
             self.log(">> Erro: O EES não exportou valores corretos. O indivíduo é inválido.")
-            self.output_dict.update({self.target_variable: self.invalid_target_value})
+            output_dict.update({self.target_variable: self.invalid_target_value})
 
-        return self.output_dict[self.target_variable]
+        return output_dict
 
     def setup_logging(self):
         logfolder = self.paths['logs']
@@ -216,38 +371,5 @@ class OptimizationStudy:
         if verbose:
             print(text)
 
-    @staticmethod
-    def variable_dict_splitter(d, max_len):
-        l = d.keys()
-        len_of_l = len(" ".join(l))
-        num_of_chunks = math.ceil(len_of_l / max_len)
-        chunk_size = math.ceil(len_of_l / num_of_chunks)
-
-        chunks = []
-        chunk = []
-        for variable in l:
-            chunk.append(variable)
-            if len(" ".join(chunk)) >= chunk_size:
-                chunks.append({var: d[var] for var in chunk})
-                chunk = []
-        else:
-            chunks.append({var: d[var] for var in chunk})
-
-        return chunks
-
-    @staticmethod
-    def variable_list_splitter(l, max_len):
-        len_of_l = len(" ".join(l))
-        num_of_chunks = math.ceil(len_of_l / max_len)
-        chunk_size = math.ceil(len_of_l / num_of_chunks)
-
-        chunks = []
-        chunk = []
-        for variable in l:
-            chunk.append(variable)
-            if len(" ".join(chunk)) >= chunk_size:
-                chunks.append(chunk)
-                chunk = []
-        else:
-            chunks.append(chunk)
-        return chunks
+    variable_dict_splitter = staticmethod(variable_dict_splitter)
+    variable_list_splitter = staticmethod(variable_list_splitter)
@@ -6,45 +6,63 @@ import json
 import datetime
 import traceback
 import random
-import win32ui
-import dde
-import pyperclip
-import subprocess
-import pandas as pd
-from icecream import ic
-from rich import print
-from deap import base
-from deap import creator
-from deap import tools
+import asyncio
+import numpy as np
 from .optimization import OptimizationStudy
+from .utilities import print_rich as print
+from .surrogate import RBFSurrogate
+from .cache import model_hash
+from .store import save_store, optimization_history_columns
+from .catalog import record_run
+
+
+class Individual(list):
+    """Decision variable values with a fitness (same as the classes made by deap.creator, without its globals)."""
+
+    fitness_class = None
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.fitness = self.fitness_class()
 
 
 class GAOptimizationStudy(OptimizationStudy):
 
-    def __init__(self, EES_exe, EES_model, base_case_inputs, outputs, runID=None):
-        super().__init__(EES_exe, EES_model, base_case_inputs, outputs, runID)
+    def __init__(self, EES_exe, EES_model, base_case_inputs, outputs, runID=None, backend=None, sessions=1,
+                 evaluation="dde", exchange="file", cache=None, readable=False,
+                 catalog=None):
+        super().__init__(EES_exe, EES_model, base_case_inputs, outputs, runID, backend, sessions, evaluation, exchange,
+                         cache, readable, catalog)
+
+    def eval_EES_model(self, individual):
+        """Solves the individual once and attaches its output dict to it (individual.outputs). Returns fitness tuple,
+        invalid_target_value if the individual is not feasible.
+        """
+        individual.outputs = self.solve_individual(individual)
+        if not self.feasible(individual):
+            return (self.invalid_target_value, )
+        return (individual.outputs[self.target_variable], )
 
     def feasible(self, individual):
-        self.eval_EES_model(individual)
-        check = []
-        for _, value in self.output_dict.items():
-            if value >= 0:
-                check.append(True)
-            else:
-                check.append(False)
-        if all(value == True for value in check):
-            return True
-        return False
+        """An individual is feasible if all of its outputs (the target and the constraints, if declared) are
+        non-negative.
+        """
+        return all(individual.outputs[output] >= 0 for output in self.evaluation_outputs
+                   if output in individual.outputs)
 
     def setup_optimizer(self, config):
+        from deap import base, tools
+
         if self.optimization_problem == "min":
-            creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
-            creator.create("Individual", list, fitness=creator.FitnessMin)
+            weights = (-1.0,)
         elif self.optimization_problem == "max":
-            creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-            creator.create("Individual", list, fitness=creator.FitnessMax)
+            weights = (1.0,)
         else:
             raise ArgumentError("Not valid optimization problem.")
+        # Classes of this study (not deap.creator globals), so studies running at the same time do not replace or
+        # delete each other's.
+        fitness_class = type("Fitness", (base.Fitness,), {"weights": weights})
+        self.Individual = type("Individual", (Individual,), {"fitness_class": fitness_class})
         self.toolbox = base.Toolbox()
 
         attrs = []
@@ -55,41 +73,96 @@ class GAOptimizationStudy(OptimizationStudy):
             attrs.append(getattr(self.toolbox, attr_name))
 
         # Structure initializers
-        self.toolbox.register("individual", tools.initCycle, creator.Individual,
+        self.toolbox.register("individual", tools.initCycle, self.Individual,
                               tuple(attrs), n=1)
         self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
 
+        if self.evaluation == "batch":
+            self.toolbox.register("map", self.batch_map)
+        else:
+            self.toolbox.register("map", self.session_pool.map)
+        # Feasibility is checked on the outputs of the same solve (see eval_EES_model).
         self.toolbox.register("evaluate", self.eval_EES_model)
         self.toolbox.register("mate", getattr(tools, config["crossover"]["method"]), **config["crossover"]["params"])
         self.toolbox.register("mutate", getattr(tools, config["mutation"]["method"]), **config["mutation"]["params"])
         self.toolbox.register("select", getattr(tools, config["selection"]["method"]), **config["selection"]["params"])
-        self.toolbox.decorate("evaluate", tools.DeltaPenalty(self.feasible, self.invalid_target_value))
 
+        self.setup_surrogate(config)
         self.is_ready['optimizer'] = True
 
+    def setup_surrogate(self, config):
+        """Optional surrogate pre-screening, enabled by config["surrogate"] (dict with the options below).
+
+        fraction: fraction of the offspring (best predicted) solved by EES while the surrogate is trusted.
+        error_threshold: surrogate error (see RBFSurrogate.error) above which the next generation is solved exactly.
+        min_samples: exact evaluations needed before screening (default: 2 * (number of decision variables + 1)).
+        """
+        self.surrogate = None
+        self.surrogate_forced = False
+        self.exact_evaluations = 0
+        if not config.get("surrogate"):
+            return
+
+        self.surrogate_config = {
+            "fraction": 0.3,
+            "error_threshold": 0.1,
+            "min_samples": 2 * (len(self.decision_variables) + 1),
+            **config["surrogate"]
+        }
+        self.surrogate = RBFSurrogate(list(self.decision_variables.values()))
+
     def execute(self, config):
-        result = {}
-        try:
-            self.setup_DDE()
-            self.setup_optimizer(config)
-            self.check_is_ready()
-            result = self.optimize(config)
-            del creator.Individual
-            # Necessário saber se é maximização ou minimização para deletar o objeto correto.
-            if self.optimization_problem == "min":
-                del creator.FitnessMin
-            elif self.optimization_problem == "max":
-                del creator.FitnessMax
-        except Exception as e:
-            self.logger.exception(e)
-            self.log(">> Erro: Algo de errado ocorreu. Está run está comprometida.")
-            self.log(traceback.format_exc())
-        finally:
-            self.close()
+        artifacts = {
+            "folder": self.paths["id_folder"],
+            "results": os.path.join(self.paths["results"], "results.npz"),
+        }
+        with record_run(self.catalog, "opt", self.runID, self.EES_model, inputs=self.base_case_inputs,
+                        config={**config, "decision_variables": getattr(self, "decision_variables", None)},
+                        parent=self.parent_run, artifacts=artifacts) as run:
+            self.catalog_run = run
+            result = {}
+            try:
+                self.setup_solver()
+                self.setup_optimizer(config)
+                self.check_is_ready()
+                result = self.optimize(config)
+            except Exception as e:
+                self.logger.exception(e)
+                self.log(">> Erro: Algo de errado ocorreu. Está run está comprometida.")
+                self.log(traceback.format_exc())
+            finally:
+                self.close()
+
+            if result:
+                run.update({
+                    "target_variable": self.target_variable,
+                    "target_value": result["best_target"][self.target_variable],
+                    "summary": {
+                        key: result[key] for key in ("best_target", "best_individual", "generations",
+                                                     "evolution_time", "evaluations", "best_output")
+                    },
+                })
+            else:
+                run["status"] = "failed"
         return result
 
+    async def execute_async(self, config):
+        """Same as execute, without blocking the event loop (runs on a thread).
+
+        The evaluations go through the DDE sessions (or batch pool) of the study, so cancelling the task does not
+        stop a generation that is already running. The sessions are opened and used on that thread. Several studies
+        can run at the same time with evaluation="batch" (or HeadlessBackend); with EESBackend only one DDE session
+        can exist at a time (see EESSession). DEAP draws from the global random module, so config["seed"] only
+        reproduces a run that is not running alongside another one.
+        """
+
+        return await asyncio.to_thread(self.execute, config)
+
     def optimize(self, config):
         """Genetic Algorithm optimization algorithm."""
+        import pandas as pd
+        from deap import tools
+
         # Tempo inicial
         start_time = time.time()
 
@@ -108,18 +181,13 @@ class GAOptimizationStudy(OptimizationStudy):
         self.log("---- Início da evolução ----")
 
         # Evaluate the entire population
-        fitnesses = []
-        for i, ind in enumerate(pop):
-            result = self.toolbox.evaluate(ind)
-            self.log(f"Nº: {i + 1} | {self.target_variable}: {result[0]}", verbose=config["verbose"])
-            self.log(
-                f"Ind: {[f'{var}: {i:.4f}' for i, var in zip(ind, self.decision_variables.keys())]}",
-                verbose=config["verbose"]
-            )
-            fitnesses.append(result)
+        self.prescreen(pop, screen=False)
+        fitnesses = self.toolbox.map(self.toolbox.evaluate, pop)
+        self.log_evaluations(pop, fitnesses, config["verbose"])
 
         for ind, fit in zip(pop, fitnesses):
             ind.fitness.values = fit
+        self.update_surrogate(pop, fitnesses)
 
         self.log(f"Calculados {len(pop)} indivíduos")
 
@@ -146,6 +214,8 @@ class GAOptimizationStudy(OptimizationStudy):
             offspring = self.toolbox.select(pop, len(pop))
             # Clone the selected individuals
             offspring = list(map(self.toolbox.clone, offspring))
+            # Parent of each position (exact fitness), kept in the place of offspring screened out by the surrogate
+            parents = list(map(self.toolbox.clone, offspring)) if self.surrogate is not None else None
 
             # Apply crossover on the offspring
             for child1, child2 in zip(offspring[::2], offspring[1::2]):
@@ -164,32 +234,37 @@ class GAOptimizationStudy(OptimizationStudy):
                     self.toolbox.mutate(mutant)
                     del mutant.fitness.values
 
-            # Evaluate the individuals with an invalid fitness
+            # Evaluate the individuals with an invalid fitness (only the promising ones, with the surrogate)
             invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-            fitnesses = []
-            for i, ind in enumerate(invalid_ind):
-                result = self.toolbox.evaluate(ind)
-                self.log(f"Nº: {i + 1} | {self.target_variable}: {result[0]}", verbose=config["verbose"])
-                self.log(
-                    f"Ind: {[f'{var}: {i:.4f}' for i, var in zip(ind, self.decision_variables.keys())]}",
-                    verbose=config["verbose"]
-                )
-                fitnesses.append(result)
+            n_invalid = len(invalid_ind)
+            invalid_ind = self.prescreen(invalid_ind)
+            fitnesses = self.toolbox.map(self.toolbox.evaluate, invalid_ind)
+            self.log_evaluations(invalid_ind, fitnesses, config["verbose"])
 
             for ind, fit in zip(invalid_ind, fitnesses):
                 ind.fitness.values = fit
+            surrogate_record = self.update_surrogate(invalid_ind, fitnesses, n_invalid - len(invalid_ind))
 
             self.log(f"Calculados {len(invalid_ind)} indivíduos")
 
+            # Offspring screened out by the surrogate were never solved: their parents stay in the population, so
+            # selection and the best individual only see fitness values computed by EES.
+            if parents is not None:
+                offspring = [parent if child.surrogate else child for child, parent in zip(offspring, parents)]
+
             # The population is entirely replaced by the offspring
             pop[:] = offspring
 
-            # Gather all the fitnesses in one list and print the stats
-            fits = [ind.fitness.values[0] for ind in pop]
+            # Gather all the fitnesses in one list and print the stats (fitnesses predicted by the surrogate are not
+            # taken into account)
+            fits = [ind.fitness.values[0] for ind in pop if not getattr(ind, "surrogate", False)]
+            fits = fits if fits else [ind.fitness.values[0] for ind in pop]
 
             n_show = 15
             pop_best_inds = self.get_best_inds(pop, n_show)
-            best_ind = tools.selBest(pop_best_inds, 1)[0]
+            best_ind = tools.selBest(pop_best_inds if pop_best_inds else pop, 1)[0]
+            # Reported individual: all outputs, even if the evaluations exported only the target and constraints.
+            best_ind.outputs = self.full_output(best_ind)
 
             self.log(f"Somente mostrando os TOP {n_show} indivíduos:")
 
@@ -216,7 +291,7 @@ class GAOptimizationStudy(OptimizationStudy):
                 error = abs(fits_old - max(fits))
                 fits_old = max(fits)
 
-            length = len(pop)
+            length = len(fits)
             mean = sum(fits) / length
             sum2 = sum(x * x for x in fits)
             std = abs(sum2 / length - mean ** 2) ** 0.5
@@ -236,8 +311,9 @@ class GAOptimizationStudy(OptimizationStudy):
             self.log(f"Avg: {mean:.5f}")
             self.log(f"Std: {std:.5f}")
             self.log(f"Rate: {rate:.2f}")
+            if self.cache is not None:
+                self.log(f"Cache: {self.cache.hit_rate():.2%}")
 
-            self.eval_EES_model(best_ind)
             gen_history.append({
                 "best_target": best_ind.fitness.values[0],
                 "best_individual": best_ind,
@@ -249,7 +325,8 @@ class GAOptimizationStudy(OptimizationStudy):
                     "std": std,
                     "rate": rate
                 },
-                "best_output": self.output_dict
+                "best_output": best_ind.outputs,
+                "surrogate": surrogate_record
             })
 
             # Critério de convergência
@@ -271,15 +348,92 @@ class GAOptimizationStudy(OptimizationStudy):
             "evolution_time": delta_t,
             "generations": g,
             "avg_rate": sum(rates) / len(rates),
+            "evaluations": self.exact_evaluations,
+            "cache": self.cache.report() if self.cache is not None else None,
             "config": config,
             "best_output": gen_history[-1]["best_output"],
             "gen_history": gen_history,
         }
 
         self.display_results(results)
-        self.save_to_json(results, "results")
+        self.save_results(results, "results")
         return results
 
+    def prescreen(self, individuals, screen=True):
+        """Predicts the individuals with the surrogate and returns the ones that must be solved by EES.
+
+        While the surrogate is trusted, only the best predicted fraction is returned. The others get the predicted
+        fitness (invalid_target_value if predicted infeasible) and are flagged with ind.surrogate = True (optimize
+        keeps their parents in the population instead). The predictions of the returned individuals are kept to measure the surrogate error after they are solved.
+        """
+        for ind in individuals:
+            ind.surrogate = False
+        self.predictions = None
+        if self.surrogate is None or not individuals or self.surrogate.n_samples() < self.surrogate_config["min_samples"]:
+            return individuals
+
+        fitnesses, feasible = self.surrogate.predict(individuals)
+        self.predictions = list(zip(fitnesses, feasible))
+        if not screen or self.surrogate_forced or np.isnan(fitnesses).any():
+            return individuals
+
+        scores = np.where(feasible, fitnesses, self.invalid_target_value)
+        order = np.argsort(-scores if self.optimization_problem == "max" else scores, kind="stable")
+        n_exact = max(1, math.ceil(self.surrogate_config["fraction"] * len(individuals)))
+        exact = sorted(order[:n_exact])
+        for k in order[n_exact:]:
+            individuals[k].fitness.values = (float(scores[k]),)
+            individuals[k].surrogate = True
+
+        self.predictions = [self.predictions[k] for k in exact]
+        return [individuals[k] for k in exact]
+
+    def update_surrogate(self, individuals, fitnesses, n_screened=0):
+        """Measures the surrogate error on the individuals just solved and adds them to its training set.
+
+        If the error is above the threshold, the next generation is solved exactly. Returns the record of the
+        generation (None without surrogate).
+        """
+        self.exact_evaluations += len(individuals)
+        if self.surrogate is None:
+            return None
+
+        values = [fit[0] for fit in fitnesses]
+        error = self.surrogate.error(self.predictions, values) if self.predictions else None
+        self.surrogate.add(individuals, values)
+        self.surrogate_forced = error is not None and error > self.surrogate_config["error_threshold"]
+
+        if error is not None:
+            self.log(f"Surrogate: erro {error:.4f} | {n_screened} indivíduos estimados")
+        if self.surrogate_forced:
+            self.log(">> Erro do surrogate acima do limite. A próxima geração será avaliada no EES.")
+        return {"error": error, "exact": len(individuals), "screened": n_screened, "forced": self.surrogate_forced}
+
+    def log_evaluations(self, inds, fitnesses, verbose):
+        for i, (ind, result) in enumerate(zip(inds, fitnesses)):
+            self.log(f"Nº: {i + 1} | {self.target_variable}: {result[0]}", verbose=verbose)
+            self.log(
+                f"Ind: {[f'{var}: {i:.4f}' for i, var in zip(ind, self.decision_variables.keys())]}",
+                verbose=verbose
+            )
+
+    def save_results(self, results, filename):
+        """Saves the generation history as columns of a store (see store.py) and the other results as its metadata.
+        JSON copies (compact and indented) only if readable.
+        """
+        metadata = {key: value for key, value in results.items() if key != "gen_history"}
+        metadata.update({
+            "model_hash": model_hash(self.EES_model),
+            "decision_variables": list(self.decision_variables.keys()),
+        })
+        save_store(
+            os.path.join(self.paths["results"], f"{filename}.npz"),
+            optimization_history_columns(results["gen_history"]),
+            metadata
+        )
+        if self.readable:
+            self.save_to_json(results, filename)
+
     def save_to_json(self, results, filename):
         with open(os.path.join(self.paths["results"], f"{filename}.json"), "w") as jsonfile:
             json.dump(results, jsonfile)
@@ -300,7 +454,7 @@ class GAOptimizationStudy(OptimizationStudy):
             rev = True
         elif self.optimization_problem == "min":
             rev = False
-        tuple_list = [(ind, ind.fitness.values[0]) for ind in pop]
+        tuple_list = [(ind, ind.fitness.values[0]) for ind in pop if not getattr(ind, "surrogate", False)]
         ordered_list = sorted(tuple_list, key=lambda x: x[1], reverse=rev)
         return [ind for ind, fitness in ordered_list[:size]]
 
@@ -1,22 +1,36 @@
 import os
 import json
 import pandas as pd
-import matplotlib
+from .store import load_optimization_results
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as font_manager
+from .plotstyle import apply_style, styled, save_figure
 
 
 class OptGraph:
+    plot_style = "optimization"
+    plot_style_overrides = None
 
-    def __init__(self, base_path: str, idx: str = None):
+    def __init__(self, base_path: str, idx: str = None, catalog=None, history_columns: list = None):
         self.base_path = base_path
+        self.catalog = catalog
+        self.history_columns = history_columns
+        self._results = None
         if idx:
             self.idx = idx
         else:
             self.idx = self.last_generated_idx()
         self.plots_folder = self.set_plots_folder()
-        self.results = self.load_results(self.idx)
-        self.set_matplotlib_globalconfig()
+
+    @property
+    def results(self) -> dict:
+        """Results of the run, loaded on first use (only history_columns of the generation history, if given)."""
+        if self._results is None:
+            self._results = self.load_results(self.idx, self.history_columns)
+        return self._results
+
+    @results.setter
+    def results(self, results: dict):
+        self._results = results
 
     def set_plots_folder(self) -> str:
         plots_folder = os.path.join(self.base_path, ".opt", self.idx, ".plots")
@@ -27,6 +41,12 @@ class OptGraph:
         return plots_folder
 
     def last_generated_idx(self) -> int:
+        if self.catalog is not None:
+            run = self.catalog.latest("opt", model=self.base_path)
+            if run is not None:
+                return run["run_id"]
+
+        # Without catalog (or for runs made before it), the greatest folder name.
         ids_folder = os.path.join(self.base_path, ".opt")
         idxs = []
         for dir in os.listdir(ids_folder):
@@ -36,44 +56,20 @@ class OptGraph:
         last_generated_idx = sorted(idxs, reverse=True)[0]
         return last_generated_idx
 
-    def load_results(self, idx: int) -> dict:
+    def load_results(self, idx: int, history_columns: list = None) -> dict:
+        filename = os.path.join(self.base_path, ".opt", idx, ".results", f"results.npz")
+        if os.path.exists(filename):
+            return load_optimization_results(filename, history_columns)
+
+        # Runs saved before the columnar store.
         filename = os.path.join(self.base_path, ".opt", idx, ".results", f"results.json")
         with open(filename, "r") as jsonfile:
             results = json.load(jsonfile)
         return results
 
     def set_matplotlib_globalconfig(self):
-        plt.style.use("ggplot")
-
-        font_dir = [r"C:\Root\Download\computer-modern"]
-        for font in font_manager.findSystemFonts(font_dir):
-            font_manager.fontManager.addfont(font)
-
-        matplotlib.rcParams["mathtext.fontset"] = "cm"
-        matplotlib.rcParams["font.family"] = "CMU Serif"
-
-        axes = {
-            "labelsize": 22,
-            "titlesize": 18,
-            "titleweight": "bold",
-            "labelweight": "bold",
-        }
-        matplotlib.rc("axes", **axes)
-
-        lines = {"linewidth": 2}
-        matplotlib.rc("lines", **lines)
-
-        legends = {"fontsize": 14}
-        matplotlib.rc("legend", **legends)
-
-        savefig = {"dpi": 300}
-        matplotlib.rc("savefig", **savefig)
-
-        matplotlib.rcParams["axes.prop_cycle"] = matplotlib.cycler(
-            color=["r", "b", "g", "m", "k"]
-        )
-        matplotlib.rcParams["ytick.labelsize"] = 15
-        matplotlib.rcParams["xtick.labelsize"] = 15
+        """Applies the style of the graphs globally (generate applies it only to its figures)."""
+        apply_style(self.plot_style, self.plot_style_overrides)
 
     def get_titles(self, lang: str) -> dict:
         if lang in ["pt-BR", "pt_BR", "ptbr"]:
@@ -95,9 +91,12 @@ class OptGraph:
 
         return titles
 
+    @styled
     def generate(self, target_display: str, lang: str = "pt-BR"):
-        target_name = list(self.results["best_target"].keys())[0]
-        target_history = pd.DataFrame(self.results["gen_history"])
+        # Only the columns of the plots are read (cached between graphs of the same run).
+        results = self._results if self._results is not None else self.load_results(self.idx, ["best_target", "error"])
+        target_name = list(results["best_target"].keys())[0]
+        target_history = pd.DataFrame(results["gen_history"])
         titles = self.get_titles(lang)
 
         fig, ax = plt.subplots(num="fitness", figsize=(9.2, 7))
@@ -106,7 +105,8 @@ class OptGraph:
         ax.set_ylabel(target_display)
         ax.plot(target_history.loc[:, "best_target"], marker="o")
         fig.tight_layout()
-        fig.savefig(
+        save_figure(
+            self, fig,
             os.path.join(self.plots_folder, f"plot_{lang}_fitness-history_{target_name}.svg"),
         )
         fig.clf()
@@ -116,7 +116,8 @@ class OptGraph:
         ax2.set_ylabel(titles["error-label"])
         ax2.plot(target_history.loc[:, "error"], marker="o")
         fig2.tight_layout()
-        fig2.savefig(
+        save_figure(
+            self, fig2,
             os.path.join(self.plots_folder, f"plot_{lang}_error-history_{target_name}.svg"),
         )
         fig2.clf()
@@ -5,18 +5,26 @@ import math
 import json
 import logging
 import datetime
-from icecream import ic
 from ees.optimization import OptimizationStudy
 from .utilities import check_model_path, get_base_folder, add_folder, ParamAnalysisMissingError
+from .catalog import record_run
 
 
 class OptParamAnalysis:
 
     def __init__(
         self, EES_exe: str, EES_model: str, inputs: dict, outputs: list,
-        decision_variables: dict, base_config: dict, params: dict, run_ID: str = None
+        decision_variables: dict, base_config: dict, params: dict, run_ID: str = None, backend=None,
+        sessions: int = 1, evaluation: str = "dde", exchange: str = "file",
+        cache=None, catalog=None
     ):
         self.EES_exe = EES_exe
+        self.catalog = catalog
+        self.backend = backend
+        self.sessions = sessions
+        self.evaluation = evaluation
+        self.exchange = exchange
+        self.cache = cache
         self.EES_model = check_model_path(EES_model)
         self.run_ID = run_ID if run_ID else str(round(time.time()))
         self.paths = self.set_paths()
@@ -26,6 +34,7 @@ class OptParamAnalysis:
         self.decision_variables = decision_variables
         self.base_config = base_config
         self.params = params
+        self.constraints = None
 
     def set_paths(self) -> str:
         """Basic paths configuration."""
@@ -47,6 +56,10 @@ class OptParamAnalysis:
         self.target_variable_display = target_variable_display
         self.optimization_problem = problem.lower()
 
+    def set_constraints(self, constraints: list):
+        """Constraint outputs of every optimization (see OptimizationStudy.set_constraints)."""
+        self.constraints = constraints
+
     def setup_logging(self) -> logging.Logger:
         """Logging configuration."""
         logger = logging.getLogger(__name__)
@@ -66,6 +79,13 @@ class OptParamAnalysis:
 
     def param_analysis(self) -> dict:
         """Execute metaheuristic optimization parameter sensitivity analysis. Returns and sets results dict."""
+        with record_run(self.catalog, "optParamAnalysis", self.run_ID, self.EES_model, inputs=self.inputs,
+                        config={"base_config": self.base_config, "params": self.params,
+                                "decision_variables": self.decision_variables},
+                        artifacts={"folder": self.paths["base_folder"], "results": self.paths["results"]}):
+            return self.run_param_analysis()
+
+    def run_param_analysis(self) -> dict:
         results = {}
         for param, values in self.params.items():
             param_results = {}
@@ -82,9 +102,14 @@ class OptParamAnalysis:
                 print(value)
 
                 filtered_result = {}
-                eesopt = self.optimizer(self.EES_exe, self.EES_model, self.inputs, self.outputs)
+                eesopt = self.optimizer(self.EES_exe, self.EES_model, self.inputs, self.outputs, backend=self.backend,
+                                        sessions=self.sessions, evaluation=self.evaluation,
+                                        exchange=self.exchange, cache=self.cache, catalog=self.catalog)
+                eesopt.parent_run = self.run_ID
                 eesopt.set_decision_variables(self.decision_variables)
                 eesopt.set_target_variable(self.target_variable, self.target_variable_display, self.optimization_problem)
+                if self.constraints is not None:
+                    eesopt.set_constraints(self.constraints)
                 result = eesopt.execute(config)
 
                 if result == {}:
@@ -104,6 +129,8 @@ class OptParamAnalysis:
                     }
                 }
                 param_results.update(filtered_result)
+                if self.catalog is not None:
+                    self.catalog.update(eesopt.catalog_run["id"], summary=filtered_result[result["run_ID"]])
 
                 # Save run result to file
                 folderpath = add_folder(self.paths["results"], self.target_variable, param)
@@ -161,7 +188,10 @@ class OptParamAnalysis:
             self.log(" ")
 
     def get_result_from_file(self) -> dict:
-        """Read parameter analisys results from folder. Returns results dict."""
+        """Read parameter analisys results from the run catalog (if any) or from folder. Returns results dict."""
+        if self.catalog is not None:
+            return self.get_result_from_catalog()
+
         results = {}
         for param, values in self.params.items():
             folderpath = os.path.join(self.paths["results"], self.target_variable, param)
@@ -177,6 +207,17 @@ class OptParamAnalysis:
         self.results = results
         return results
 
+    def get_result_from_catalog(self) -> dict:
+        """Same as get_result_from_file, with a single query for the optimization runs of this analysis."""
+        runs = self.catalog.find(run_type="opt", model=self.EES_model, parent=self.run_ID, status="done",
+                                 target_variable=self.target_variable, order_by="started", descending=False)
+        results = {param: {} for param in self.params}
+        for run in runs:
+            if run["summary"].get("param_studied") in results:
+                results[run["summary"]["param_studied"]].update({run["run_id"]: run["summary"]})
+        self.results = results
+        return results
+
     def log(self, text: str, verbose=True):
         self.logger.info(text)
         if verbose:
@@ -1,20 +1,35 @@
 import os
 import time
-import pandas as pd
-import subprocess
-from icecream import ic
-from .utilities import check_model_path
+import json
+import asyncio
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .utilities import check_model_path, add_folder, not_converged, SolverError
+from .backends import EESBackend
+from .workers import WorkerPool
+from .cache import model_hash
+from .store import save_store, export_readable
+from .macros import import_solve_export, write_macro
+from .catalog import record_run
 
 
 class ParametricStudy:
 
-    def __init__(self, paths, base_case_inputs, variable, parametric_inputs, outputs, run_id=None):
+    def __init__(self, paths, base_case_inputs, variable, parametric_inputs, outputs, run_id=None, continuation=False,
+                 readable=False):
         self.run_id = run_id
+        self.continuation = continuation
+        self.readable = readable
         self.variable = variable
         self.paths = self.set_paths(paths)
         self.base_case_inputs = base_case_inputs
         self.parametric_inputs = parametric_inputs
-        self.datfiles = {'inputs': [], 'outputs': []}
+        self.datfiles = {
+            'inputs': [None] * len(parametric_inputs),
+            'outputs': [None] * len(parametric_inputs)
+        }
+        self.solve_times = [float('nan')] * len(parametric_inputs)
         self.outputs = outputs
 
     def set_paths(self, paths):
@@ -53,88 +68,174 @@ class ParametricStudy:
         Sets:
             List of output files
         """
-        input_strings = self.prepare_input_strings()
-        output_string = self.prepare_output_string()
+        for i, input_string in enumerate(self.prepare_input_strings()):
+            macro_string = self.handle_point(macro_string, input_string, i)
 
-        for i, input_string in enumerate(input_strings):
-            input_filepath = self.create_input_datfile(input_string, i)
-            output_filepath = self.store_output_datfile(output_string, i)
+        return macro_string
 
-            macro_string = self.update_macro_string(
-                macro_string,
-                input_filepath,
-                output_filepath,
-            )
+    def sweep_order(self):
+        """Order in which the points are solved. Returns list of (i, export) tuples.
 
-        return macro_string
+        Without continuation, the order given by the user. With continuation, points are sorted and the sweep
+        starts at the value closest to the base case, walks up to the maximum and then down to the minimum, so
+        every solve starts from the solution of its neighbour. Before walking down, the starting point is solved
+        again without being exported (export=False) to bring the guess values back to it.
+        """
 
-    def prepare_input_strings(self):
-        """Creates a List of string inputs for DAT files."""
+        if not self.continuation:
+            return [(i, True) for i in range(len(self.parametric_inputs))]
+
+        values = [float(value) for value in self.parametric_inputs]
+        order = sorted(range(len(values)), key=lambda i: values[i])
+        if not order:
+            return []
+
+        base_value = self.base_case_inputs.get(self.variable)
+        if base_value is None:
+            start = 0
+        else:
+            start = min(range(len(order)), key=lambda k: abs(values[order[k]] - float(base_value)))
+
+        steps = [(i, True) for i in order[start:]]
+        if start > 0:
+            steps.append((order[start], False))
+            steps.extend([(i, True) for i in reversed(order[:start])])
+        return steps
+
+    def handle_anchor(self, macro_string, input_string, i, folder=None):
+        """Solves the i-th parametric value again only to update the guess values (nothing is exported)."""
+
+        folder = add_folder(folder) if folder else self.paths['datfiles']
+        filepath = os.path.join(folder, f'anchor_{i + 1}.dat')
+
+        with open(filepath, 'w') as datfile:
+            datfile.write(input_string)
+
+        return macro_string + import_solve_export(filepath, self.base_case_inputs.keys(), None, [], update_guesses=True)
+
+    def handle_point(self, macro_string, input_string, i, folder=None):
+        """Creates the .DAT files of the i-th parametric value (in folder, if given) and adds it to macro string."""
+
+        input_filepath = self.create_input_datfile(input_string, i, folder)
+        output_filepath = self.store_output_datfile(self.prepare_output_string(), i, folder)
+
+        return self.update_macro_string(
+            macro_string,
+            input_filepath,
+            output_filepath,
+        )
+
+    def prepare_inputs(self):
+        """Creates a List of input dicts (base case updated with each parametric value)."""
 
         inputs = []
         for value in self.parametric_inputs:
             mod_input = dict(self.base_case_inputs)
             mod_input.update({self.variable: value})
-            inputs.append(' '.join([str(var) for var in mod_input.values()]))
+            inputs.append(mod_input)
 
         return inputs
 
+    def prepare_input_strings(self):
+        """Creates a List of string inputs for DAT files."""
+
+        return [' '.join([str(var) for var in mod_input.values()]) for mod_input in self.prepare_inputs()]
+
     def prepare_output_string(self):
         """Joins output variables together (Necessery for EES)."""
 
         return ' '.join(self.outputs)
 
-    def create_input_datfile(self, input_string, i):
+    def create_input_datfile(self, input_string, i, folder=None):
         """Creates input datfile and stores path in self.datfiles['inputs'] for each parametric value."""
 
-        filepath = os.path.join(self.paths['datfiles'], f'input_{i + 1}.dat')
+        folder = add_folder(folder) if folder else self.paths['datfiles']
+        filepath = os.path.join(folder, f'input_{i + 1}.dat')
 
         with open(filepath, 'w') as datfile:
             datfile.write(input_string)
 
-        self.datfiles['inputs'].append(filepath)
+        self.datfiles['inputs'][i] = filepath
         return filepath
 
-    def store_output_datfile(self, output, i):
-        """Stores output file path in self.datfiles['outputs']"""
+    def store_output_datfile(self, output, i, folder=None):
+        """Stores output file path in self.datfiles['outputs'] and removes a stale file from a previous run."""
 
-        filepath = os.path.join(self.paths['datfiles'], f'OUTPUT_{i + 1}.DAT')
-        self.datfiles['outputs'].append(filepath)
+        folder = folder if folder else self.paths['datfiles']
+        filepath = os.path.join(folder, f'OUTPUT_{i + 1}.DAT')
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        self.datfiles['outputs'][i] = filepath
         return filepath
 
     def update_macro_string(self, macro_string, input_filepath, output_filepath):
         """Updates macro string with EES commands to read from DATFILE, solve and export to DATFILE."""
 
-        input_names_string = ' '.join(self.base_case_inputs.keys())
-        output_names_string = ' '.join(self.outputs)
+        return macro_string + import_solve_export(
+            input_filepath,
+            self.base_case_inputs.keys(),
+            output_filepath,
+            self.outputs,
+            update_guesses=self.continuation
+        )
 
-        macro_string += f'Import \'{input_filepath}\' {input_names_string}\n'
-        macro_string += 'Solve\n'
-        macro_string += f'Export \'{output_filepath}\' {output_names_string}\n'
+    def write_cached_output(self, output_dict, i):
+        """Writes the output datfile of the i-th parametric value from an already known output dict."""
 
-        return macro_string
+        filepath = self.store_output_datfile(self.prepare_output_string(), i)
+        with open(filepath, 'w') as datfile:
+            datfile.write('\t'.join([repr(float(output_dict[var])) for var in self.outputs]) + '\n')
+        return filepath
+
+    def read_output(self, i):
+        """Output dict of the i-th parametric value, or None if its OUTPUT file was not (completely) written yet.
+
+        The export ends with a line break, so a file whose last value is still being written is not complete.
+        """
+
+        filepath = self.datfiles['outputs'][i]
+        if filepath is None or not os.path.exists(filepath):
+            return None
+        with open(filepath, 'r') as datfile:
+            content = datfile.read()
+        if not content.endswith('\n') or len(content.split()) < len(self.outputs):
+            return None
+        return self.clean_up_outputs(content)
 
     def get_outputs(self):
         """Read the output files created by EES. Returns Pandas DataFrame."""
+        import pandas as pd
 
-        df = pd.DataFrame({})
+        rows = []
         for output_path in self.datfiles['outputs']:
             with open(output_path, 'r') as datfile:
-                df = df.append(self.clean_up_outputs(datfile.read()), ignore_index=True)
+                rows.append(datfile.read().split()[:len(self.outputs)])
 
+        # Single parse of all points into a (points x outputs) array.
+        values = np.array(rows, dtype=float).reshape(len(rows), len(self.outputs))
+
+        df = pd.DataFrame(values, columns=self.outputs)
         df[self.variable] = pd.Series(self.parametric_inputs).values
         self.results = df
         self.save()
         return df
 
     def save(self):
-        """Save outputs as JSON and CSV."""
-        filename_json = f'parametric_result.json'
-        filename_ijson = f'indented_parametric_result.json'
-        filename_csv = f'parametric_result.csv'
-        self.results.to_csv(os.path.join(self.paths['results'], filename_csv), sep=';')
-        self.results.to_json(os.path.join(self.paths['results'], filename_ijson), orient="columns", indent=4)
-        self.results.to_json(os.path.join(self.paths['results'], filename_json), orient="columns")
+        """Save outputs and solve times in a columnar store (see store.py). CSV/JSON copies only if readable."""
+
+        columns = {column: self.results[column].to_numpy() for column in self.results.columns}
+        columns['solve_time'] = np.asarray(self.solve_times, dtype=float)
+        metadata = {
+            'run_id': self.run_id,
+            'model_hash': model_hash(self.paths['model_path']),
+            'variable': self.variable,
+            'base_case_inputs': self.base_case_inputs,
+            'outputs': list(self.outputs),
+            'created': time.time(),
+        }
+        filepath = save_store(os.path.join(self.paths['results'], 'parametric_result.npz'), columns, metadata)
+        if self.readable:
+            export_readable(filepath)
 
     def graphs(self, params):
         """Plots/saves graphs for each parameter parsed. Not customizable."""
@@ -153,8 +254,19 @@ class ParametricStudy:
 
 class ParametricStudies:
 
-    def __init__(self, EES_exe, EES_model, base_case_inputs, parametric_inputs, outputs, run_id=None):
+    def __init__(self, EES_exe, EES_model, base_case_inputs, parametric_inputs, outputs, run_id=None, backend=None,
+                 workers=1, cache=None, continuation=False, resume=False, chunk_size=None, chunk_runtime=None,
+                 readable=False, catalog=None):
         self.EES_exe = EES_exe
+        self.readable = readable
+        self.catalog = catalog
+        self.chunk_size = chunk_size
+        self.chunk_runtime = chunk_runtime
+        self.resume = resume
+        self.continuation = continuation
+        self.cache = cache
+        self.workers = workers
+        self.backend = backend if backend else EESBackend(EES_exe)
         self.EES_model = check_model_path(EES_model)
         self.paths = self.set_paths(self.EES_model)
         self.base_case_inputs = base_case_inputs
@@ -162,9 +274,14 @@ class ParametricStudies:
         self.variables = parametric_inputs.keys()
         self.outputs = outputs
         self.parametric_studies = {}
-        self.macro_string = ''
+        self.macro_strings = []
         self.results = {}
         self.run_id = str(run_id) if run_id else str(round(time.time()))
+        self.cached_points = set()
+        self.salvaged_points = set()
+        self.completed_points = set()
+        if self.cache is not None:
+            self.cache.invalidate_stale(self.EES_model)
 
     def set_paths(self, EES_model):
         """Set paths that will be used as a dictionary and creats them if not already."""
@@ -184,22 +301,282 @@ class ParametricStudies:
         return paths
 
     def execute(self):
-        """Executes the macro file on EES via subprocess module. Returns DataFrame with results."""
+        """Executes the macro files on EES (one per worker). Returns DataFrame with results."""
+
+        with self.record():
+            # Initialize instances of ParametricStudy class and update macro strings
+            self.initialize()
+
+            # Run EES and execute macro files
+            self.start_time = time.time()
+            self.run_points()
+
+            return self.get_output()
+
+    def record(self):
+        """Records the run in the run catalog (if any)."""
+
+        run_folder = os.path.join(self.paths['base_folder'], self.run_id)
+        return record_run(
+            self.catalog, 'parametric', self.run_id, self.EES_model, inputs=self.base_case_inputs,
+            config={
+                'parametric_inputs': {variable: list(values) for variable, values in self.parametric_inputs.items()},
+                'outputs': self.outputs,
+                'workers': self.workers,
+                'continuation': self.continuation,
+                'chunk_size': self.chunk_size,
+                'chunk_runtime': self.chunk_runtime,
+            },
+            artifacts={
+                'folder': run_folder,
+                'results': {
+                    variable: os.path.join(run_folder, '.results', variable, 'parametric_result.npz')
+                    for variable in self.variables
+                },
+            }
+        )
+
+    def execute_adaptive(self, refine_outputs, tolerance=0.01, jump=0.1, max_points=100, max_iterations=10):
+        """Adaptive sweep. Starts with parametric_inputs (coarse) and inserts the midpoint of the intervals where
+        any of refine_outputs is poorly resolved, until no interval needs it, max_points per variable or
+        max_iterations. Returns Dictionary of DataFrames sorted by the parametric variable.
+
+        An interval is refined when the deviation of one of its ends from the chord of its neighbours (curvature)
+        is above tolerance, or when the output jumps more than jump across it, both relative to the output range.
+        Points already solved are salvaged between iterations (see resume), so every point is solved once. The
+        refined values are added to a copy of parametric_inputs (the dict given by the caller is not changed) and
+        the number of points inserted by each iteration is kept in self.refinements.
+        """
+
+        self.parametric_inputs = dict(self.parametric_inputs)
+        self.variables = self.parametric_inputs.keys()
+        self.refinements = []
+        resume = self.resume
+        self.resume = True
+        try:
+            for iteration in range(max_iterations):
+                results = self.execute()
+                new_points = {}
+                for variable, df in results.items():
+                    budget = max_points - len(df)
+                    values = self.refinement_points(df, variable, refine_outputs, tolerance, jump, budget)
+                    if values:
+                        new_points[variable] = values
+                if not new_points:
+                    break
+                self.refinements.append({variable: len(values) for variable, values in new_points.items()})
+                for variable, values in new_points.items():
+                    self.parametric_inputs[variable] = list(self.parametric_inputs[variable]) + values
+        finally:
+            self.resume = resume
+
+        for variable, study in self.parametric_studies.items():
+            order = np.argsort(study.results[variable].to_numpy(dtype=float), kind='stable')
+            study.results = study.results.iloc[order].reset_index(drop=True)
+            study.solve_times = [study.solve_times[k] for k in order]
+            study.save()
+            self.results[variable] = study.results
+        return self.results
+
+    def refinement_points(self, df, variable, refine_outputs, tolerance, jump, budget):
+        """Midpoints of the intervals of variable that need refinement, most critical first (at most budget)."""
+
+        if budget <= 0 or len(df) < 2:
+            return []
+
+        df = df.sort_values(variable)
+        x = df[variable].to_numpy(dtype=float)
+        priority = np.zeros(len(x) - 1)
+        for output in refine_outputs:
+            y = df[output].to_numpy(dtype=float)
+            span = np.nanmax(y) - np.nanmin(y)
+            if not np.isfinite(span) or span == 0:
+                continue
+            y = (y - np.nanmin(y)) / span
+
+            deviation = np.zeros(len(x))
+            if len(x) > 2:
+                weight = (x[1:-1] - x[:-2]) / (x[2:] - x[:-2])
+                deviation[1:-1] = np.abs(y[1:-1] - (y[:-2] + weight * (y[2:] - y[:-2])))
+            curvature = np.maximum(deviation[:-1], deviation[1:]) / tolerance
+            jumps = np.abs(np.diff(y)) / jump
+            priority = np.fmax(priority, np.fmax(curvature, jumps))
+
+        # Intervals are not split below a millionth of the sweep range (e.g. at a discontinuity).
+        min_width = (x[-1] - x[0]) * 1e-6
+        candidates = [k for k in np.argsort(-priority, kind='stable') if priority[k] > 1 and x[k + 1] - x[k] > min_width]
+        return [float((x[k] + x[k + 1]) / 2) for k in candidates[:budget]]
+
+    def stream(self, poll_interval=0.2):
+        """Same as execute, as a generator of (variable, i, output dict) tuples.
+
+        Points are yielded as soon as their OUTPUT file is written (points read from cache first), while the macros
+        run on a background thread. After the generator is exhausted, get_output() assembles the DataFrames.
+        """
+
+        with self.record():
+            self.initialize()
+
+            pending = [point for point in self.all_points() if point not in self.completed_points]
+
+            self.start_time = time.time()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                running = executor.submit(self.run_points)
+                while pending:
+                    finished = running.done()
+                    ready = self.ready_points(pending)
+                    self.record_completed(ready)
+                    yield from ready
+                    solved = {(variable, i) for variable, i, _ in ready}
+                    pending = [point for point in pending if point not in solved]
+                    if finished:
+                        break
+                    time.sleep(poll_interval)
+                running.result()
+
+    async def execute_async(self, semaphore=None, poll_interval=0.2):
+        """Same as execute, on asyncio subprocesses. If given, semaphore bounds the concurrent EES processes."""
+
+        with self.record():
+            self.submit_async(semaphore, poll_interval)
+            await self.task
+            return self.get_output()
+
+    def submit_async(self, semaphore=None, poll_interval=0.2):
+        """Schedules the study on the running event loop. Returns dict of futures, one per point.
+
+        Keys are (variable, i) and each future gets the output dict of the point as soon as its OUTPUT file is
+        written (or SolverError if EES did not write it). Cancelling self.task kills the EES processes.
+        """
 
-        # Initialize instances of ParametricStudy class and update macro string
         self.initialize()
 
-        # Creates macro file (.emf)
-        macro_filepath = self.setup_macro()
+        loop = asyncio.get_running_loop()
+        self.point_futures = {point: loop.create_future() for point in self.all_points()}
+        self.resolve_points()
+
+        self.task = asyncio.ensure_future(self.run_async(semaphore, poll_interval))
+        return self.point_futures
+
+    async def run_async(self, semaphore, poll_interval):
+        self.start_time = time.time()
+        watcher = asyncio.ensure_future(self.watch_points(poll_interval))
+        try:
+            await self.run_points_async(semaphore)
+        except BaseException as e:
+            for future in self.point_futures.values():
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            raise
+        finally:
+            watcher.cancel()
+        self.resolve_points(final=True)
+
+    async def watch_points(self, poll_interval):
+        while True:
+            await asyncio.sleep(poll_interval)
+            self.resolve_points()
+
+    def resolve_points(self, final=False):
+        """Sets the result of the futures whose OUTPUT file is ready. If final, the missing ones get SolverError."""
+
+        pending = [point for point, future in self.point_futures.items() if not future.done()]
+        ready = self.ready_points(pending)
+        self.record_completed(ready)
+        for variable, i, output_dict in ready:
+            self.point_futures[(variable, i)].set_result(output_dict)
+
+        if final:
+            for (variable, i), future in self.point_futures.items():
+                if not future.done():
+                    future.set_exception(SolverError(f"O EES não gerou o resultado do ponto {i + 1} de {variable}."))
+
+    def ready_points(self, points):
+        """(variable, i, output dict) of the (variable, i) points whose OUTPUT file is ready."""
+
+        ready = []
+        for variable, i in points:
+            output_dict = self.parametric_studies[variable].read_output(i)
+            if output_dict is not None:
+                ready.append((variable, i, output_dict))
+        return ready
+
+    def all_points(self):
+        return [
+            (variable, i)
+            for variable, study in self.parametric_studies.items()
+            for i in range(len(study.parametric_inputs))
+        ]
+
+    def record_completed(self, points):
+        """Adds the (variable, i, ...) points to the completed ones and updates the manifest, if any is new."""
+
+        new_points = {(variable, i) for variable, i, *_ in points} - self.completed_points
+        if new_points:
+            self.completed_points.update(new_points)
+            self.save_manifest()
+
+    def manifest_path(self):
+        return os.path.join(self.paths['base_folder'], self.run_id, 'manifest.json')
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path()):
+            return {}
+        with open(self.manifest_path(), 'r') as jsonfile:
+            return json.load(jsonfile)
+
+    def save_manifest(self):
+        """Writes the manifest of the run: model hash, planned points (inputs and OUTPUT files) and completed points.
+
+        The file is replaced atomically, so a crash never leaves a partial manifest.
+        """
+
+        manifest = {
+            'model_hash': model_hash(self.EES_model),
+            'outputs': list(self.outputs),
+            'studies': {
+                variable: {
+                    'inputs': study.prepare_input_strings(),
+                    'output_files': study.datfiles['outputs'],
+                    'completed': sorted(i for v, i in self.completed_points if v == variable)
+                }
+                for variable, study in self.parametric_studies.items()
+            }
+        }
+        temporary_path = self.manifest_path() + '.tmp'
+        with open(temporary_path, 'w') as jsonfile:
+            json.dump(manifest, jsonfile, indent=4)
+        os.replace(temporary_path, self.manifest_path())
+
+    def salvage(self, manifest, study, i, input_string):
+        """Reuses the OUTPUT file of the i-th point of study from a previous run of this run_id, if it was solved
+        with the same model file, outputs and inputs. Returns True if the point was salvaged.
+        """
 
-        # Run EES and execute macro file
-        subprocess.run([self.EES_exe, macro_filepath, '/hide', '/NOSPLASH'])
+        planned = manifest.get('studies', {}).get(study.variable)
+        if not planned or manifest['model_hash'] != model_hash(self.EES_model) or manifest['outputs'] != list(self.outputs):
+            return False
+        if i >= len(planned['inputs']) or planned['inputs'][i] != input_string or not planned['output_files'][i]:
+            return False
 
-        return self.get_output()
+        study.datfiles['outputs'][i] = planned['output_files'][i]
+        if study.read_output(i) is None:
+            study.datfiles['outputs'][i] = None
+            return False
+        return True
 
     def initialize(self):
-        """Initialize instances for each parametric study that will be done."""
+        """Initialize instances for each parametric study that will be done and shard their points across workers."""
 
+        manifest = self.load_manifest() if self.resume else {}
+        self.cached_points = set()
+        self.salvaged_points = set()
+
+        points = []
         for variable, parametric_input in self.parametric_inputs.items():
             self.parametric_studies.update({
                 variable: ParametricStudy(
@@ -208,31 +585,219 @@ class ParametricStudies:
                     variable,
                     parametric_input,
                     self.outputs,
-                    self.run_id
+                    self.run_id,
+                    self.continuation,
+                    self.readable
                 )
             })
-            self.macro_string = self.parametric_studies[variable].handle_inputs(self.macro_string)
+            study = self.parametric_studies[variable]
+            all_inputs = study.prepare_inputs()
+            input_strings = study.prepare_input_strings()
+            # Previous step of the sweep, if it is not solved in this run (salvaged or read from cache).
+            previous = None
+            for i, export in study.sweep_order():
+                if export and self.salvage(manifest, study, i, input_strings[i]):
+                    self.salvaged_points.add((variable, i))
+                    previous = i
+                    continue
+
+                output_dict = None
+                if export and self.cache is not None:
+                    output_dict = self.cache.get(self.EES_model, all_inputs[i], self.outputs)
+                if output_dict is not None:
+                    study.write_cached_output(output_dict, i)
+                    self.cached_points.add((variable, i))
+                    previous = i
+                    continue
+
+                if self.continuation and export and previous is not None:
+                    # Brings the guess values back to the neighbour before solving the point.
+                    points.append((study, previous, input_strings[previous], False))
+                points.append((study, i, input_strings[i], export))
+                previous = None
+
+            # Anchors at the end of the sweep have no point left to bring the guess values to.
+            while points and points[-1][0] is study and not points[-1][3]:
+                points.pop()
+
+        self.pool = WorkerPool(
+            self.backend,
+            self.EES_model,
+            os.path.join(self.paths['base_folder'], self.run_id),
+            self.workers
+        )
+
+        self.macro_strings = []
+        self.schedules = []
+        self.schedule_starts = []
+        self.steps = points
+        self.next_step = 0
+        self.chunk_times = []
+        self.chunk_lock = threading.Lock()
+
+        # With chunks, macro strings are built as workers get free (see next_chunk), the OUTPUT files are known upfront.
+        if self.chunked():
+            for study, i, _, export in points:
+                if export:
+                    study.store_output_datfile(study.prepare_output_string(), i)
+
+        for worker, shard in zip(self.pool.workers, [] if self.chunked() else self.pool.shard(range(len(points)))):
+            shard = list(shard)
+            # An anchor at the end of a shard is wasted: the next shard (a new solver process) solves it first.
+            while shard and not points[shard[-1]][3]:
+                shard.pop()
+            anchor = self.continuation_anchor(shard[0]) if shard else None
+            macro_string = ''
+            schedule = []
+            for study, i, input_string, export in ([anchor] if anchor else []) + [points[k] for k in shard]:
+                folder = None
+                if self.pool.size > 1:
+                    folder = os.path.join(worker['folder'], '.datfiles', study.variable)
+                if export:
+                    macro_string = study.handle_point(macro_string, input_string, i, folder)
+                    schedule.append((study, i))
+                else:
+                    macro_string = study.handle_anchor(macro_string, input_string, i, folder)
+            self.macro_strings.append(macro_string)
+            self.schedules.append(schedule)
+            self.schedule_starts.append(None)
+
+        self.completed_points = self.salvaged_points | self.cached_points
+        self.save_manifest()
+
+    def chunked(self):
+        return bool(self.chunk_size or self.chunk_runtime)
+
+    def run_points(self):
+        """Runs the points on the solver: one macro per worker or, with chunks, a new solver process per chunk."""
+
+        if self.chunked():
+            self.pool.run_chunks(self.next_chunk, self.chunk_done)
+        else:
+            self.pool.run(self.setup_macros())
+
+    async def run_points_async(self, semaphore=None):
+        if self.chunked():
+            await self.pool.run_chunks_async(self.next_chunk, self.chunk_done, semaphore)
+        else:
+            await self.pool.run_async(self.setup_macros(), semaphore)
+
+    def next_chunk(self):
+        """Builds the macro string of the next chunk of points. Returns (chunk id, macro string) or None at the end.
+
+        Called by the workers as they get free. With continuation, a chunk that starts in the middle of a sweep
+        solves the previous step again first (as an anchor), since it runs on a new solver process.
+        """
+
+        with self.chunk_lock:
+            if self.next_step >= len(self.steps):
+                return None
+
+            size = self.chunk_length()
+            macro_string = ''
+            schedule = []
+
+            anchor = self.continuation_anchor(self.next_step)
+            if anchor:
+                study, i, input_string, _ = anchor
+                macro_string = study.handle_anchor(macro_string, input_string, i)
+
+            while self.next_step < len(self.steps) and len(schedule) < size:
+                study, i, input_string, export = self.steps[self.next_step]
+                self.next_step += 1
+                if export:
+                    macro_string = study.handle_point(macro_string, input_string, i)
+                    schedule.append((study, i))
+                else:
+                    macro_string = study.handle_anchor(macro_string, input_string, i)
+
+            self.macro_strings.append(macro_string)
+            self.schedules.append(schedule)
+            self.schedule_starts.append(time.time())
+            return len(self.schedules) - 1, macro_string
+
+    def continuation_anchor(self, k):
+        """With continuation, the previous step of the sweep as an anchor (not exported) for a new solver process
+        that starts at step k in the middle of a sweep. None otherwise.
+        """
+
+        if not self.continuation or k == 0 or not self.steps[k][3]:
+            return None
+        previous_study, i, input_string, _ = self.steps[k - 1]
+        if previous_study is not self.steps[k][0]:
+            return None
+        return previous_study, i, input_string, False
+
+    def chunk_length(self):
+        """Points per chunk: chunk_size or, with chunk_runtime, estimated from the time per point of the chunks already
+        solved (limited to chunk_size, if given). Chunks before the first estimate have chunk_size (or 1) points.
+        """
+
+        if not self.chunk_runtime or not self.chunk_times:
+            return self.chunk_size or 1
 
-    def setup_macro(self):
-        """Adds necessary header and Footer to macro string and create macro file."""
+        points = sum(n_points for n_points, _ in self.chunk_times)
+        elapsed = sum(chunk_time for _, chunk_time in self.chunk_times)
+        length = max(1, int(self.chunk_runtime * points / elapsed)) if elapsed > 0 else len(self.steps)
+        return min(length, self.chunk_size) if self.chunk_size else length
 
-        macro_header = "//WINDOWSIZE 0 401 1496 317\n"
-        macro_header += f'Open \'{self.EES_model}\'\n'
-        macro_header += 'Units SI C kPa kJ Mass\n'
-        self.macro_string = macro_header + self.macro_string
-        self.macro_string += 'Quit'
+    def chunk_done(self, chunk_id, elapsed):
+        with self.chunk_lock:
+            self.chunk_times.append((len(self.schedules[chunk_id]), elapsed))
 
-        macro_filepath = os.path.join(self.paths['base_folder'], self.run_id, 'macro.emf')
-        with open(macro_filepath, 'w') as emffile:
-            emffile.write(self.macro_string)
+    def setup_macros(self):
+        """Creates one macro file per worker (with points to solve). Returns list of macro filepaths."""
 
-        return macro_filepath
+        return [
+            write_macro(os.path.join(worker['folder'], 'macro.emf'), worker['model'], macro_string)
+            for worker, macro_string in zip(self.pool.workers, self.macro_strings)
+            if macro_string
+        ]
 
     def get_output(self):
         """
         Run get_outputs method from ParametricStudy for each variable studied. 
         Returns Dictionary of Dataframes.
         """
+        self.measure_solve_times()
+
+        pending = [point for point in self.all_points() if point not in self.completed_points]
+        self.record_completed(self.ready_points(pending))
+        missing = len(self.all_points()) - len(self.completed_points)
+        if missing:
+            raise SolverError(
+                f"{missing} ponto(s) sem resultado. Execute novamente com resume=True para resolver apenas eles."
+            )
+
         for variable, studie in self.parametric_studies.items():
             self.results.update({variable: studie.get_outputs()})
+            if self.cache is not None:
+                self.store_in_cache(studie)
         return self.results
+
+    def measure_solve_times(self):
+        """Per-point solve time (s), from the modification times of consecutive OUTPUT files of each worker (or chunk).
+
+        The first point of each worker (or chunk) also includes EES startup. Points read from cache keep NaN.
+        """
+
+        if not hasattr(self, 'start_time'):
+            return
+        for schedule, start in zip(self.schedules, self.schedule_starts):
+            previous = start if start is not None else self.start_time
+            for study, i in schedule:
+                filepath = study.datfiles['outputs'][i]
+                if not os.path.exists(filepath):
+                    continue
+                modified = os.path.getmtime(filepath)
+                study.solve_times[i] = modified - previous
+                previous = modified
+
+    def store_in_cache(self, study):
+        """Stores the outputs of the points of the study that were solved (not read from cache)."""
+
+        output_dicts = study.results[self.outputs].to_dict('records')
+        for i, (inputs, output_dict) in enumerate(zip(study.prepare_inputs(), output_dicts)):
+            # Points that have not converged are not cached (they would be read back as valid evaluations).
+            if (study.variable, i) not in self.cached_points and not not_converged(output_dict.values()):
+                self.cache.set(self.EES_model, inputs, output_dict)
@@ -1,27 +1,38 @@
 import os
 import pandas as pd
-import matplotlib
+from .store import load_parametric_results
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as font_manager
+from .plotstyle import apply_style
 
 
 class Graphs:
-    def __init__(self, base_paths, variable):
+    plot_style = "parametric"
+    plot_style_overrides = None
+
+    def __init__(self, base_paths, variable, columns=None):
         self.variable = variable
         self.base_paths = base_paths
-        self.dfs = self.get_df()
+        self.columns = columns
+        self._dfs = None
         self.plots_folder = self.set_plots_folder()
-        self.set_matplotlib_globalconfig()
 
-    def get_df(self):
-        dfs = {}
-        for base_path in self.base_paths:
-            filepath = os.path.join(
-                base_path, ".results", self.variable, "parametric_result.csv"
-            )
+    @property
+    def dfs(self):
+        """DataFrames of each model, loaded on first use."""
+        if self._dfs is None:
+            self._dfs = self.get_df()
+        return self._dfs
+
+    @dfs.setter
+    def dfs(self, dfs):
+        self._dfs = dfs
 
-            dfs.update({os.path.basename(base_path): pd.read_csv(filepath, sep=";")})
-        return dfs
+    def get_df(self):
+        """Loads the results of all models concurrently (only self.columns and the variable, if columns is given)."""
+        columns = None if self.columns is None else [self.variable] + [c for c in self.columns if c != self.variable]
+        results_folders = [os.path.join(base_path, ".results", self.variable) for base_path in self.base_paths]
+        dfs = load_parametric_results(results_folders, columns)
+        return {os.path.basename(base_path): df for base_path, df in zip(self.base_paths, dfs)}
 
     def set_plots_folder(self):
         models_folder = os.path.dirname(self.base_paths[0])
@@ -34,35 +45,5 @@ class Graphs:
         return plots_folder
 
     def set_matplotlib_globalconfig(self):
-        plt.style.use("ggplot")
-
-        font_dir = [r"C:\Root\Download\computer-modern"]
-        for font in font_manager.findSystemFonts(font_dir):
-            font_manager.fontManager.addfont(font)
-
-        matplotlib.rcParams["mathtext.fontset"] = "cm"
-        matplotlib.rcParams["font.family"] = "CMU Serif"
-
-        axes = {
-            "labelsize": 22,
-            "titlesize": 18,
-            "titleweight": "bold",
-            "labelweight": "bold",
-        }
-        matplotlib.rc("axes", **axes)
-
-        lines = {"linewidth": 2}
-        matplotlib.rc("lines", **lines)
-
-        legends = {"fontsize": 14}
-        matplotlib.rc("legend", **legends)
-
-        savefig = {"dpi": 300}
-        matplotlib.rc("savefig", **savefig)
-
-        matplotlib.rcParams["axes.prop_cycle"] = matplotlib.cycler(
-            color=["004c6d", "7aaac6"],
-            linestyle=["-", "--"]
-        )
-        matplotlib.rcParams["ytick.labelsize"] = 15
-        matplotlib.rcParams["xtick.labelsize"] = 15
+        """Applies the style of the graphs globally (generate applies it only to its figures)."""
+        apply_style(self.plot_style, self.plot_style_overrides)
@@ -0,0 +1,157 @@
+import os
+import json
+import functools
+import threading
+from contextlib import contextmanager
+import matplotlib
+import matplotlib.style
+import matplotlib.font_manager as font_manager
+
+
+FONT_DIRS = [r"C:\Root\Download\computer-modern"]
+FONT_CACHE = os.path.join(os.path.expanduser('~'), '.ees', 'fonts.json')
+
+BASE_STYLE = {
+    "mathtext.fontset": "cm",
+    "font.family": "CMU Serif",
+    "axes.titleweight": "bold",
+    "axes.labelweight": "bold",
+    "lines.linewidth": 2,
+    "savefig.dpi": 300,
+}
+
+# Styles of the graph classes (rcParams on top of ggplot and BASE_STYLE).
+STYLES = {
+    "parametric": {
+        "axes.labelsize": 22,
+        "axes.titlesize": 18,
+        "legend.fontsize": 14,
+        "xtick.labelsize": 15,
+        "ytick.labelsize": 15,
+        "axes.prop_cycle": matplotlib.cycler(color=["004c6d", "7aaac6"], linestyle=["-", "--"]),
+    },
+    "optimization": {
+        "axes.labelsize": 22,
+        "axes.titlesize": 18,
+        "legend.fontsize": 14,
+        "xtick.labelsize": 15,
+        "ytick.labelsize": 15,
+        "axes.prop_cycle": matplotlib.cycler(color=["r", "b", "g", "m", "k"]),
+    },
+    "opt_param": {
+        "axes.labelsize": 20,
+        "axes.titlesize": 16,
+        "legend.fontsize": 11,
+        "xtick.labelsize": 15,
+        "ytick.labelsize": 15,
+        "axes.prop_cycle": matplotlib.cycler(color=["004c6d", "175e7f", "297191", "3984a3", "4998b6", "5aadc8",
+                                                    "6bc1da", "7dd6ed", "8fecff"]),
+    },
+}
+
+_fonts_lock = threading.Lock()
+_fonts_registered = False
+
+
+def font_files(font_dirs):
+    """Font files of the directories. The list of each directory is cached on disk (FONT_CACHE) until the
+    directory changes, so findSystemFonts does not scan it again.
+    """
+
+    cache = {}
+    if os.path.exists(FONT_CACHE):
+        try:
+            with open(FONT_CACHE, 'r') as jsonfile:
+                cache = json.load(jsonfile)
+        except (OSError, ValueError):
+            cache = {}
+
+    fonts = []
+    changed = False
+    for font_dir in font_dirs:
+        if not os.path.isdir(font_dir):
+            continue
+        modified = os.path.getmtime(font_dir)
+        entry = cache.get(font_dir)
+        if entry is None or entry['modified'] != modified:
+            entry = {'modified': modified, 'fonts': font_manager.findSystemFonts([font_dir])}
+            cache[font_dir] = entry
+            changed = True
+        fonts.extend(entry['fonts'])
+
+    if changed:
+        os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+        with open(FONT_CACHE, 'w') as jsonfile:
+            json.dump(cache, jsonfile)
+    return fonts
+
+
+def register_fonts(font_dirs=None):
+    """Adds the fonts of font_dirs (FONT_DIRS if None) to matplotlib, once per process."""
+
+    global _fonts_registered
+    with _fonts_lock:
+        if _fonts_registered:
+            return
+        for font in font_files(font_dirs if font_dirs is not None else FONT_DIRS):
+            font_manager.fontManager.addfont(font)
+        _fonts_registered = True
+
+
+@functools.lru_cache(maxsize=None)
+def style_params(name):
+    """rcParams of a style (built once per process)."""
+
+    if name not in STYLES:
+        raise ValueError(f"Estilo inválido: {name}. Opções: {', '.join(STYLES)}.")
+    return {**matplotlib.style.library["ggplot"], **BASE_STYLE, **STYLES[name]}
+
+
+@contextmanager
+def style(name, overrides=None):
+    """Applies a style (plus overrides, dict of rcParams) only inside the with block."""
+
+    register_fonts()
+    params = style_params(name)
+    if overrides:
+        params = {**params, **overrides}
+    with matplotlib.rc_context(params):
+        yield
+
+
+def styled(method):
+    """Decorator of the methods of the graph classes that create figures: runs them inside the style of the
+    instance (plot_style and plot_style_overrides attributes).
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with style(self.plot_style, getattr(self, "plot_style_overrides", None)):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def apply_style(name, overrides=None):
+    """Applies a style globally (for code that creates figures outside of a styled method)."""
+
+    register_fonts()
+    matplotlib.rcParams.update(style_params(name))
+    if overrides:
+        matplotlib.rcParams.update(overrides)
+
+
+def save_figure(graph, fig, filepath, **kwargs):
+    """Saves a figure of a graph class and adds its path to graph.saved_files. With the figure_format attribute
+    of the graph (e.g. 'png', set by rendering.render), the extension of filepath is replaced by it. Returns the
+    path of the saved file.
+    """
+
+    figure_format = getattr(graph, "figure_format", None)
+    if figure_format:
+        filepath = f"{os.path.splitext(filepath)[0]}.{figure_format}"
+        kwargs.pop("format", None)
+    fig.savefig(filepath, **kwargs)
+    if getattr(graph, "saved_files", None) is None:
+        graph.saved_files = []
+    graph.saved_files.append(filepath)
+    return filepath
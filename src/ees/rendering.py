@@ -0,0 +1,92 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+
+class FigureJob:
+    """One figure set: graph_class(*args, **kwargs).generate(*generate_args, lang=lang, **generate_kwargs).
+
+    graph_class (and setup, if given) must be importable by the worker processes, i.e. defined at module level.
+    setup(graph) runs before generate (e.g. to drop outliers from graph.dfs). With fmt (e.g. 'png'), the figures
+    are saved in that format whatever extension generate gives them (it is set as the figure_format of the graph,
+    used by plotstyle.save_figure).
+    """
+
+    def __init__(self, graph_class, args=(), kwargs=None, generate_args=(), generate_kwargs=None, lang=None,
+                 fmt=None, setup=None, name=None):
+        self.graph_class = graph_class
+        self.args = tuple(args)
+        self.kwargs = kwargs if kwargs else {}
+        self.generate_args = tuple(generate_args)
+        self.generate_kwargs = generate_kwargs if generate_kwargs else {}
+        if lang is not None:
+            self.generate_kwargs['lang'] = lang
+        self.fmt = fmt
+        self.setup = setup
+        self.name = name if name else ' '.join(
+            [graph_class.__name__] + [str(arg) for arg in self.args[1:2]] + ([lang] if lang else [])
+        )
+
+
+def render(jobs, workers=None):
+    """Renders the figure jobs in a process pool (one job at a time per process) on the Agg backend.
+
+    Returns list (same order of jobs) of dicts with the job name, the time to build the graph (load, s) and to
+    generate the figures (render, s), the files saved with plotstyle.save_figure and the traceback if the job
+    failed (None otherwise).
+    With workers=1 the jobs run in this process.
+    """
+
+    jobs = list(jobs)
+    workers = workers if workers else min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        setup_worker()
+        return [render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as executor:
+        return list(executor.map(render_job, jobs))
+
+
+def setup_worker():
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    matplotlib.use('Agg')
+    plt.switch_backend('Agg')
+
+
+def render_job(job):
+    import matplotlib.pyplot as plt
+
+    timing = {'job': job.name, 'load': None, 'render': None, 'files': [], 'error': None}
+    graph = None
+    try:
+        start = time.perf_counter()
+        graph = job.graph_class(*job.args, **job.kwargs)
+        if job.fmt:
+            graph.figure_format = job.fmt
+        if job.setup is not None:
+            job.setup(graph)
+        timing['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph.generate(*job.generate_args, **job.generate_kwargs)
+        timing['render'] = time.perf_counter() - start
+    except Exception:
+        timing['error'] = traceback.format_exc()
+    finally:
+        plt.close('all')
+    timing['files'] = list(getattr(graph, 'saved_files', None) or [])
+    return timing
+
+
+def print_timings(timings):
+    """Prints the per-job timings returned by render."""
+
+    for timing in timings:
+        if timing['error']:
+            print(f"{timing['job']}: erro\n{timing['error']}")
+            continue
+        print(f"{timing['job']}: {timing['load']:.2f} s (leitura) + {timing['render']:.2f} s "
+              f"({len(timing['files'])} figura(s))")
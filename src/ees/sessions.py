@@ -0,0 +1,70 @@
+import time
+from .utilities import SolverError
+
+
+class SessionManager:
+    """Starts and stops solver sessions, keeping track of the ones it started.
+
+    Only sessions started by the manager are ever shut down or killed. Startup (until EES answers via DDE)
+    and teardown (until the process exits) latencies are recorded for every session.
+    """
+
+    def __init__(self, backend, timeout=60, poll_interval=0.5):
+        self.backend = backend
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.sessions = []
+        self.latencies = {'startup': [], 'teardown': []}
+
+    def start(self, server_name):
+        """Opens a new session and waits until it is ready. Returns the session."""
+
+        session = self.backend.open_session(server_name)
+        self.start_session(session)
+        self.sessions.append(session)
+        return session
+
+    def start_session(self, session):
+        start_time = time.time()
+        session.start(self.timeout, self.poll_interval)
+        self.latencies['startup'].append(time.time() - start_time)
+
+    def restart(self, session):
+        """Kills the session process and starts it again."""
+
+        session.kill()
+        self.start_session(session)
+
+    def stop(self, session):
+        """Closes the session (it is killed if it does not close cleanly)."""
+
+        start_time = time.time()
+        try:
+            session.close(self.timeout)
+        finally:
+            self.latencies['teardown'].append(time.time() - start_time)
+            if session in self.sessions:
+                self.sessions.remove(session)
+
+    def stop_all(self):
+        """Closes every session started by the manager. Returns list of errors (empty if all closed cleanly)."""
+
+        errors = []
+        for session in list(self.sessions):
+            try:
+                self.stop(session)
+            except SolverError as e:
+                errors.append(e)
+        return errors
+
+    def metrics(self):
+        """Startup and teardown latencies (s): count, mean and max."""
+
+        metrics = {}
+        for name, values in self.latencies.items():
+            metrics[name] = {
+                'count': len(values),
+                'mean': sum(values) / len(values) if values else 0.0,
+                'max': max(values) if values else 0.0,
+            }
+        return metrics
@@ -1,18 +1,26 @@
 import os
 import time
-import json
-import pandas as pd
-import subprocess
-from icecream import ic
+import asyncio
 from .utilities import NoModelError
 from .utilities import check_model_path
+from .backends import EESBackend
+from .cache import model_hash
+from .store import save_store, export_readable
+from .catalog import record_run
 
 
 class SolveModel:
 
-    def __init__(self, EES_exe, EES_model, inputs, outputs, runID=None):
+    def __init__(self, EES_exe, EES_model, inputs, outputs, runID=None, backend=None, cache=None, readable=False,
+                 catalog=None):
         self.EES_exe = EES_exe
+        self.readable = readable
+        self.catalog = catalog
+        self.backend = backend if backend else EESBackend(EES_exe)
         self.EES_model = check_model_path(EES_model)
+        self.cache = cache
+        if self.cache is not None:
+            self.cache.invalidate_stale(self.EES_model)
         self.runID = str(runID) if runID else str(round(time.time()))
         self.paths = self.set_paths(self.EES_model)
         self.inputs = inputs
@@ -120,19 +128,62 @@ class SolveModel:
         return macro_filepath
 
     def execute(self):
-        """Executes the macro file on EES via subprocess module. Returns DataFrame with results."""
+        """Executes the macro file on EES via subprocess module. Returns DataFrame with results.
 
-        if "EES.exe" in str(subprocess.check_output('tasklist')):
-            self.log(">> Uma instância do EES foi encontrada aberta. Ela será fechada.")
-            os.system("taskkill /f /im  EES.exe")
-
-        # Set input datfile and output filename.
-        self.handle_inputs()
-
-        # Run EES and execute macro file
-        subprocess.run([self.EES_exe, self.paths['macro_path'], '/hide', '/NOSPLASH'])
+        If the inputs are in the evaluation cache, EES is not run (and the arrays CSV is not created).
+        """
 
-        return self.get_output()
+        with self.record():
+            if self.cache is not None:
+                cached_results = self.cache.get(self.EES_model, self.inputs, self.outputs)
+                if cached_results is not None:
+                    self.results = cached_results
+                    self.save()
+                    return self.results
+
+            # Set input datfile and output filename.
+            self.handle_inputs()
+
+            # Run EES and execute macro file
+            self.backend.run_macro(self.paths['macro_path'])
+
+            results = self.get_output()
+            if self.cache is not None:
+                self.cache.set(self.EES_model, self.inputs, results)
+            return results
+
+    async def execute_async(self, semaphore: asyncio.Semaphore = None):
+        """Same as execute, on an asyncio subprocess. If given, semaphore bounds the concurrent EES processes."""
+
+        with self.record():
+            if self.cache is not None:
+                cached_results = self.cache.get(self.EES_model, self.inputs, self.outputs)
+                if cached_results is not None:
+                    self.results = cached_results
+                    self.save()
+                    return self.results
+
+            self.handle_inputs()
+
+            if semaphore is None:
+                await self.backend.run_macro_async(self.paths['macro_path'])
+            else:
+                async with semaphore:
+                    await self.backend.run_macro_async(self.paths['macro_path'])
+
+            results = self.get_output()
+            if self.cache is not None:
+                self.cache.set(self.EES_model, self.inputs, results)
+            return results
+
+    def record(self):
+        """Records the run in the run catalog (if any)."""
+
+        return record_run(
+            self.catalog, 'solver', self.runID, self.EES_model, inputs=self.inputs, config={'outputs': self.outputs},
+            artifacts={'folder': self.paths['base_folder'],
+                       'results': os.path.join(self.paths['base_folder'], 'results.npz')}
+        )
 
     def get_output(self):
         """Read utput file created by EES. Returns Dictionary."""
@@ -144,15 +195,22 @@ class SolveModel:
         return self.results
 
     def save(self):
-        """Save inputs, outputs as JSON."""
-        inputs_filename = f'inputs.json'
-        results_filename = f'results.json'
-
-        with open(os.path.join(self.paths['base_folder'], inputs_filename), 'w') as jsonfile:
-            json.dump(self.inputs, jsonfile, indent=4)
-
-        with open(os.path.join(self.paths['base_folder'], results_filename), 'w') as jsonfile:
-            json.dump(self.results, jsonfile, indent=4)
+        """Save outputs (one row store, see store.py) with the inputs as metadata. CSV/JSON copies only if readable."""
+
+        metadata = {
+            'run_id': self.runID,
+            'model_hash': model_hash(self.EES_model),
+            'inputs': self.inputs,
+            'outputs': list(self.outputs),
+            'created': time.time(),
+        }
+        filepath = save_store(
+            os.path.join(self.paths['base_folder'], 'results.npz'),
+            {output: [value] for output, value in self.results.items()},
+            metadata
+        )
+        if self.readable:
+            export_readable(filepath)
 
     def clean_up_outputs(self, str_outputs):
         """Turns string from DAT file in a dict with variable name and value."""
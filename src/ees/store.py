@@ -0,0 +1,223 @@
+import os
+import json
+import threading
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Columns already read from each store file (filepath -> (file signature, metadata, dict of name -> array, column
+# names)), so graphs regenerated from the same results do not parse them again. Entries are dropped when the file
+# changes.
+STORE_CACHE_SIZE = 64
+_store_cache = OrderedDict()
+_store_cache_lock = threading.Lock()
+
+
+def save_store(filepath, columns, metadata=None):
+    """Saves float64 columns (dict of name -> 1-d values) and a JSON-serializable metadata dict in a single
+    columnar file. Compressed npz by default; Parquet if filepath ends with .parquet (needs pyarrow).
+    Returns filepath.
+    """
+
+    names = list(columns.keys())
+    metadata = metadata if metadata else {}
+
+    if filepath.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: np.asarray(values, dtype=np.float64) for name, values in columns.items()})
+        table = table.replace_schema_metadata({'metadata': json.dumps(metadata)})
+        pq.write_table(table, filepath)
+        return filepath
+
+    np.savez_compressed(
+        filepath,
+        names=np.array(names, dtype=str),
+        metadata=np.array(json.dumps(metadata)),
+        **{f'column_{k}': np.asarray(columns[name], dtype=np.float64) for k, name in enumerate(names)}
+    )
+    return filepath
+
+
+def load_store(filepath, columns=None):
+    """Reads a file written by save_store. Returns (dict of name -> array, metadata dict).
+
+    Only the requested columns (all if None) are read from disk, and only once while the file does not change
+    (see clear_store_cache). The arrays are shared with the cache, so they are read-only.
+    """
+
+    stat = os.stat(filepath)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _store_cache_lock:
+        cached = _store_cache.get(filepath)
+        if cached is not None and cached[0] != signature:
+            cached = None
+
+    if cached is None:
+        loaded, metadata, names = read_store(filepath, columns)
+        cached = (signature, metadata, {}, names)
+    else:
+        _, metadata, arrays, names = cached
+        missing = [name for name in (names if columns is None else columns) if name in names and name not in arrays]
+        loaded = read_store(filepath, missing)[0] if missing else {}
+
+    for values in loaded.values():
+        values.flags.writeable = False
+    with _store_cache_lock:
+        cached[2].update(loaded)
+        _store_cache[filepath] = cached
+        _store_cache.move_to_end(filepath)
+        while len(_store_cache) > STORE_CACHE_SIZE:
+            _store_cache.popitem(last=False)
+
+    arrays = cached[2]
+    wanted = cached[3] if columns is None else [name for name in columns if name in arrays]
+    return {name: arrays[name] for name in wanted}, dict(cached[1])
+
+
+def read_store(filepath, columns=None):
+    """Reads the given columns (all if None) of a store from disk. Returns (dict of name -> array, metadata dict,
+    list of all column names).
+    """
+
+    if filepath.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(filepath).names
+        table = pq.read_table(filepath, columns=columns)
+        metadata = json.loads(table.schema.metadata[b'metadata'])
+        return {name: table.column(name).to_numpy() for name in table.column_names}, metadata, names
+
+    with np.load(filepath) as data:
+        names = [str(name) for name in data['names']]
+        wanted = names if columns is None else [name for name in columns if name in names]
+        loaded = {name: data[f'column_{names.index(name)}'] for name in wanted}
+        return loaded, json.loads(str(data['metadata'])), names
+
+
+def clear_store_cache():
+    with _store_cache_lock:
+        _store_cache.clear()
+
+
+def store_names(filepath):
+    """Column names of a store, without reading the columns."""
+
+    if filepath.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_schema(filepath).names
+
+    with np.load(filepath) as data:
+        return [str(name) for name in data['names']]
+
+
+def load_dataframe(filepath, columns=None):
+    """Same as load_store, as a pandas DataFrame (metadata in df.attrs)."""
+    import pandas as pd
+
+    loaded, metadata = load_store(filepath, columns)
+    df = pd.DataFrame(loaded)
+    df.attrs.update(metadata)
+    return df
+
+
+def export_readable(filepath, formats=('csv', 'json')):
+    """Writes human-readable copies of a store next to it (semicolon CSV and/or indented JSON with the columns
+    and the metadata), on demand. Returns list of the written files.
+    """
+
+    base = os.path.splitext(filepath)[0]
+    df = load_dataframe(filepath)
+    written = []
+    if 'csv' in formats:
+        df.to_csv(f'{base}.csv', sep=';')
+        written.append(f'{base}.csv')
+    if 'json' in formats:
+        with open(f'{base}.json', 'w') as jsonfile:
+            json.dump({'metadata': df.attrs, 'columns': df.to_dict(orient='list')}, jsonfile, indent=4)
+        written.append(f'{base}.json')
+    return written
+
+
+def load_parametric_result(results_folder, columns=None):
+    """DataFrame of a parametric result folder (.results/<variable>): parametric_result.npz or, for runs saved
+    before the columnar store, parametric_result.csv.
+    """
+    import pandas as pd
+
+    store_path = os.path.join(results_folder, 'parametric_result.npz')
+    if os.path.exists(store_path):
+        return load_dataframe(store_path, columns)
+    return pd.read_csv(os.path.join(results_folder, 'parametric_result.csv'), sep=';', usecols=columns)
+
+
+def load_parametric_results(results_folders, columns=None, workers=4):
+    """Same as load_parametric_result for several folders (e.g. one per model), read concurrently.
+    Returns list of DataFrames in the same order.
+    """
+
+    results_folders = list(results_folders)
+    if len(results_folders) < 2 or workers < 2:
+        return [load_parametric_result(folder, columns) for folder in results_folders]
+    with ThreadPoolExecutor(max_workers=min(workers, len(results_folders))) as executor:
+        return list(executor.map(lambda folder: load_parametric_result(folder, columns), results_folders))
+
+
+def optimization_history_columns(gen_history):
+    """Columns (one row per generation) of the gen_history of an optimization result."""
+
+    columns = {
+        'best_target': [generation['best_target'] for generation in gen_history],
+        'error': [generation['error'] for generation in gen_history],
+    }
+    for stat in ('min', 'max', 'avg', 'std', 'rate'):
+        columns[f'stats:{stat}'] = [generation['stats'][stat] for generation in gen_history]
+    if gen_history:
+        for k, _ in enumerate(gen_history[0]['best_individual']):
+            columns[f'individual:{k}'] = [generation['best_individual'][k] for generation in gen_history]
+        # Union of the outputs of every generation (NaN where a generation does not have it).
+        outputs = dict.fromkeys(output for generation in gen_history for output in generation['best_output'])
+        for output in outputs:
+            columns[f'output:{output}'] = [generation['best_output'].get(output, np.nan) for generation in gen_history]
+        if any(generation.get('surrogate') for generation in gen_history):
+            for field in ('error', 'exact', 'screened', 'forced'):
+                columns[f'surrogate:{field}'] = [
+                    np.nan if not generation.get('surrogate') or generation['surrogate'][field] is None
+                    else float(generation['surrogate'][field])
+                    for generation in gen_history
+                ]
+    return columns
+
+
+def load_optimization_results(filepath, history_columns=None):
+    """Results dict of an optimization run saved by GAOptimizationStudy (results.npz), in the same layout the
+    optimization returns. With history_columns (e.g. ['best_target', 'error']), only those columns of the
+    generation history are read and each generation dict only has them.
+    """
+
+    columns, results = load_store(filepath, history_columns)
+    n_generations = len(next(iter(columns.values()))) if columns else 0
+
+    gen_history = []
+    for g in range(n_generations):
+        generation = {}
+        for name, values in columns.items():
+            group, _, field = name.partition(':')
+            if not field:
+                generation[name] = float(values[g])
+            elif group == 'individual':
+                generation.setdefault('best_individual', []).append(float(values[g]))
+            elif group == 'output':
+                generation.setdefault('best_output', {})
+                if not np.isnan(values[g]):
+                    generation['best_output'][field] = float(values[g])
+            elif group == 'stats':
+                generation.setdefault('stats', {})[field] = float(values[g])
+            elif group == 'surrogate':
+                generation.setdefault('surrogate', {})[field] = None if np.isnan(values[g]) else float(values[g])
+        gen_history.append(generation)
+
+    results['gen_history'] = gen_history
+    return results
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class RBFSurrogate:
+    """Radial basis function model of the fitness and of the feasibility of the individuals.
+
+    Both are cubic RBF interpolants with a linear tail over the decision variables (normalized by their bounds),
+    trained online on every exact evaluation. Feasibility is the sign of the interpolant of +1 (feasible) / -1
+    (infeasible) labels. Infeasible individuals (non-finite fitness) are not used by the fitness model.
+    """
+
+    def __init__(self, bounds, smoothing=1e-10):
+        bounds = np.asarray(bounds, dtype=float)
+        self.lower = bounds[:, 0]
+        self.scale = np.where(bounds[:, 1] > bounds[:, 0], bounds[:, 1] - bounds[:, 0], 1.0)
+        self.smoothing = smoothing
+        self.X = []
+        self.fitnesses = []
+        self.fitness_model = None
+        self.feasibility_model = None
+        self.trained = False
+
+    def normalize(self, individuals):
+        return (np.asarray(individuals, dtype=float) - self.lower) / self.scale
+
+    def add(self, individuals, fitnesses):
+        """Adds exact evaluations (fitness values, non-finite if infeasible) to the training set."""
+
+        self.X.extend([list(ind) for ind in individuals])
+        self.fitnesses.extend([float(fitness) for fitness in fitnesses])
+        self.trained = False
+
+    def n_samples(self):
+        return len(self.X)
+
+    def fit(self):
+        X, index = np.unique(self.normalize(self.X), axis=0, return_index=True)
+        fitnesses = np.asarray(self.fitnesses)[index]
+        feasible = np.isfinite(fitnesses)
+
+        self.fitness_model = None
+        if feasible.sum() > X.shape[1] + 1:
+            self.fitness_model = self.interpolant(X[feasible], fitnesses[feasible])
+            self.fitness_range = np.ptp(fitnesses[feasible]) or 1.0
+
+        if feasible.all() or not feasible.any():
+            self.feasibility_model = bool(feasible.all())
+        else:
+            self.feasibility_model = self.interpolant(X, np.where(feasible, 1.0, -1.0))
+        self.trained = True
+
+    def interpolant(self, X, y):
+        n, d = X.shape
+        phi = self.kernel(X, X) + self.smoothing * np.eye(n)
+        tail = np.hstack([np.ones((n, 1)), X])
+        system = np.block([[phi, tail], [tail.T, np.zeros((d + 1, d + 1))]])
+        rhs = np.concatenate([y, np.zeros(d + 1)])
+        try:
+            coefficients = np.linalg.solve(system, rhs)
+        except np.linalg.LinAlgError:
+            coefficients = np.linalg.lstsq(system, rhs, rcond=None)[0]
+        return X, coefficients[:n], coefficients[n:]
+
+    def kernel(self, A, B):
+        distances = np.sqrt(((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=2))
+        return distances ** 3
+
+    def evaluate(self, model, X):
+        centers, weights, tail = model
+        return self.kernel(X, centers) @ weights + tail[0] + X @ tail[1:]
+
+    def predict(self, individuals):
+        """Predicted (fitness, feasible) arrays of the individuals. Fitness is NaN while the model is not trained."""
+
+        if not self.trained:
+            self.fit()
+
+        X = self.normalize(individuals)
+        if self.fitness_model is None:
+            fitnesses = np.full(len(X), np.nan)
+        else:
+            fitnesses = self.evaluate(self.fitness_model, X)
+
+        if isinstance(self.feasibility_model, bool):
+            feasible = np.full(len(X), self.feasibility_model)
+        else:
+            feasible = self.evaluate(self.feasibility_model, X) > 0
+        return fitnesses, feasible
+
+    def error(self, predictions, fitnesses):
+        """Mean prediction error: |predicted - exact| normalized by the range of the training fitnesses, and 1 for
+        each wrong feasibility prediction.
+        """
+
+        errors = []
+        for (predicted, predicted_feasible), fitness in zip(predictions, fitnesses):
+            feasible = np.isfinite(fitness)
+            if feasible != predicted_feasible or (feasible and np.isnan(predicted)):
+                errors.append(1.0)
+            elif feasible:
+                errors.append(abs(predicted - fitness) / self.fitness_range)
+            else:
+                errors.append(0.0)
+        return float(np.mean(errors)) if errors else None
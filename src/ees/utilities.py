@@ -12,6 +12,10 @@ class ParamAnalysisMissingError(Exception):
     """Raised when a Param Analysis is missing."""
 
 
+class SolverError(Exception):
+    """Raised when the communication with the solver (EES or its stand-in) fails."""
+
+
 def check_model_path(path):
     """Check if model path is absolute and check if file exists."""
 
@@ -78,6 +82,21 @@ def d_difference(d1: dict, d2: dict) -> Union[str, int, float]:
             return v2
 
 
+def not_converged(values) -> bool:
+    """True if the exported values (numbers or strings) look like a run that has not converged, i.e. EES returned
+    the default guess value (1) of its variables: more than 3 of them, or all of them if 4 or fewer were exported.
+    """
+    values = [float(value) for value in values]
+    guesses = sum(1 for value in values if value == 1.0)
+    return bool(values) and guesses > min(3, len(values) - 1)
+
+
+def print_rich(*objects, **kwargs):
+    """rich.print, imported on first use (rich is not needed to import the package)."""
+    from rich import print as rich_print
+    rich_print(*objects, **kwargs)
+
+
 def main():
     """Experiment with utilites functions."""
     base_folder = os.getcwd()
@@ -0,0 +1,164 @@
+import os
+import queue
+import shutil
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .utilities import add_folder
+from .macros import write_macro
+
+
+class WorkerPool:
+    """Pool of concurrent solver processes.
+
+    Each worker has its own copy of the model and its own folder (for datfiles and macro), so several
+    EES instances never share files. A pool of size 1 uses the original model and base folder.
+    """
+
+    def __init__(self, backend, EES_model, base_folder, size=1):
+        self.backend = backend
+        self.EES_model = EES_model
+        self.base_folder = base_folder
+        self.size = max(1, int(size))
+        self.workers = self.setup_workers()
+
+    def setup_workers(self):
+        """Creates workers folders and copies the model to each one of them. Returns list of dicts."""
+
+        if self.size == 1:
+            return [{'id': 1, 'model': self.EES_model, 'folder': self.base_folder}]
+
+        workers = []
+        for k in range(self.size):
+            folder = add_folder(self.base_folder, '.workers', f'worker_{k + 1}')
+            model_copy = os.path.join(folder, os.path.basename(self.EES_model))
+            shutil.copy2(self.EES_model, model_copy)
+            workers.append({'id': k + 1, 'model': model_copy, 'folder': folder})
+        return workers
+
+    def shard(self, items):
+        """Splits items in contiguous shards, one per worker, keeping their original order."""
+
+        items = list(items)
+        n_shards = min(self.size, len(items)) or 1
+        base, extra = divmod(len(items), n_shards)
+
+        shards = []
+        start = 0
+        for k in range(n_shards):
+            end = start + base + (1 if k < extra else 0)
+            shards.append(items[start:end])
+            start = end
+        return shards
+
+    def run(self, macro_filepaths):
+        """Runs each macro file on its own solver process, at most self.size at a time."""
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(self.backend.run_macro, macro_filepaths))
+
+    async def run_async(self, macro_filepaths, semaphore=None):
+        """Same as run, on asyncio subprocesses. A shared semaphore bounds the processes across pools."""
+
+        semaphore = semaphore if semaphore else asyncio.Semaphore(self.size)
+
+        async def run_macro(macro_filepath):
+            async with semaphore:
+                await self.backend.run_macro_async(macro_filepath)
+
+        await asyncio.gather(*[run_macro(macro_filepath) for macro_filepath in macro_filepaths])
+
+    def run_chunks(self, next_chunk, chunk_done=None):
+        """Runs chunks of work on the first free worker, each chunk on a new solver process.
+
+        next_chunk() returns (chunk id, macro string without header) or None when there is nothing left. It is called
+        by the workers as they get free, so chunks can be sized on the fly. chunk_done(chunk id, elapsed seconds) is
+        called after each chunk.
+        """
+
+        def work(worker):
+            while True:
+                chunk = next_chunk()
+                if chunk is None:
+                    return
+                start = time.time()
+                self.backend.run_macro(self.write_chunk_macro(worker, *chunk))
+                if chunk_done:
+                    chunk_done(chunk[0], time.time() - start)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            list(executor.map(work, self.workers))
+
+    async def run_chunks_async(self, next_chunk, chunk_done=None, semaphore=None):
+        """Same as run_chunks, on asyncio subprocesses. A shared semaphore bounds the processes across pools."""
+
+        semaphore = semaphore if semaphore else asyncio.Semaphore(self.size)
+
+        async def work(worker):
+            while True:
+                async with semaphore:
+                    chunk = next_chunk()
+                    if chunk is None:
+                        return
+                    start = time.time()
+                    await self.backend.run_macro_async(self.write_chunk_macro(worker, *chunk))
+                if chunk_done:
+                    chunk_done(chunk[0], time.time() - start)
+
+        await asyncio.gather(*[work(worker) for worker in self.workers])
+
+    def write_chunk_macro(self, worker, chunk_id, macro_string):
+        return write_macro(os.path.join(worker['folder'], f'macro_{chunk_id + 1}.emf'), worker['model'], macro_string)
+
+
+async def gather_bounded(coroutines, limit):
+    """Same as asyncio.gather (results in the same order), with at most limit coroutines running at a time."""
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*[run(coroutine) for coroutine in coroutines])
+
+
+class SessionPool:
+    """Pool of independent solver sessions (DDE conversations). Each session is used by one thread at a time.
+
+    Functions mapped by the pool get the session checked out by their thread through current(). With more than one
+    session, the sessions are used from worker threads, so only backends with concurrent_sessions can have more than
+    one (EES DDE conversations are bound to the thread and the process that answers the "EES" service).
+    """
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.available = queue.Queue()
+        for session in self.sessions:
+            self.available.put(session)
+        self.local = threading.local()
+
+    def current(self):
+        """Session checked out by the calling thread (first session outside of map)."""
+
+        return getattr(self.local, 'session', None) or self.sessions[0]
+
+    def run(self, function, item):
+        session = self.available.get()
+        self.local.session = session
+        try:
+            return function(item)
+        finally:
+            self.local.session = None
+            self.available.put(session)
+
+    def map(self, function, items):
+        """Same as builtin map (results in the same order as items), running on all sessions concurrently."""
+
+        items = list(items)
+        if len(self.sessions) == 1:
+            return [self.run(function, item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=len(self.sessions)) as executor:
+            return list(executor.map(lambda item: self.run(function, item), items))